@@ -4,6 +4,7 @@ import { AssetManager } from './AssetManager';
 import { ProjectState } from './ProjectState';
 import { 
   PDFExportConfig, 
+  PDFColumnConfig,
   PDFGenerationResult, 
   PDFGenerationProgress, 
   GroupedProductData, 
@@ -13,6 +14,27 @@ import {
 } from '../../shared/types/exportTypes';
 import { EXPORT_CONFIG } from '../../shared/config/exportConfig';
 
+// Column key -> cell text, built once at module load instead of switching per cell
+const CELL_VALUE_GETTERS: Readonly<Record<string, (product: ProductForExport) => string>> = {
+  productName: product => product.productName || '',
+  type: product => product.type || '',
+  specificationDescription: product => product.specificationDescription || '',
+  manufacturer: product => product.manufacturer || '',
+  price: product => product.price ? `$${product.price.toFixed(2)}` : '',
+  category: product => product.category.join(', '),
+  location: product => product.location.join(', '),
+  tagId: product => product.tagId || '',
+  url: () => 'Link',
+};
+
+// A visible column paired with its cell getter, resolved once per document
+interface RowColumn {
+  column: PDFColumnConfig;
+  getValue: (product: ProductForExport) => string;
+}
+
+const EMPTY_CELL = (): string => '';
+
 export class PDFExportService {
   private layout: PDFLayoutConfig;
   private progressCallback?: (progress: PDFGenerationProgress) => void;
@@ -43,11 +65,18 @@ export class PDFExportService {
 
       // Group and sort products
       const groupedData = this.groupAndSortProducts(products, config);
+
+      // Look up all product images concurrently; page layout below is sequential
+      const includeImageColumn = config.includeImages &&
+        config.columns.some(col => col.visible && col.key === 'image');
+      const imagePaths = includeImageColumn
+        ? await this.resolveImagePaths(products)
+        : new Map<string, string>();
       
       this.reportProgress('generating_pdf', 25, 'Creating PDF document...');
 
       // Create PDF document
-      const doc = await this.createPDFDocument(groupedData, config);
+      const doc = await this.createPDFDocument(groupedData, config, imagePaths);
       
       this.reportProgress('saving', 90, 'Saving PDF file...');
 
@@ -143,7 +172,11 @@ export class PDFExportService {
     });
   }
 
-  private async createPDFDocument(groupedData: GroupedProductData[], config: PDFExportConfig): Promise<PDFKit.PDFDocument> {
+  private async createPDFDocument(
+    groupedData: GroupedProductData[],
+    config: PDFExportConfig,
+    imagePaths: Map<string, string>
+  ): Promise<PDFKit.PDFDocument> {
     // Determine page size
     const pageSize = config.pageSize === 'A4' ? 'A4' : 'LETTER';
     const landscape = config.orientation === 'landscape';
@@ -158,6 +191,16 @@ export class PDFExportService {
     // Add document header
     this.addDocumentHeader(doc, config, groupedData);
 
+    // Column layout is the same for every row, so resolve it once per document
+    const visibleColumns = config.columns.filter(col => col.visible);
+    const rowColumns: RowColumn[] = visibleColumns.map(column => ({
+      column,
+      getValue: CELL_VALUE_GETTERS[column.key] || EMPTY_CELL,
+    }));
+    const tableWidth = doc.page.width - this.layout.margins.left - this.layout.margins.right;
+    const totalRows = groupedData.reduce((sum, g) => sum + g.products.length, 0);
+    let rowsRendered = 0;
+
     let currentY = doc.y + this.layout.spacing.sectionGap;
 
     // Add each group
@@ -175,7 +218,7 @@ export class PDFExportService {
 
       // Add table header if enabled
       if (config.includeHeaders) {
-        currentY = this.addTableHeader(doc, config, currentY);
+        currentY = this.addTableHeader(doc, visibleColumns, tableWidth, currentY);
       }
 
       // Add products
@@ -189,16 +232,16 @@ export class PDFExportService {
           
           // Re-add table header on new page
           if (config.includeHeaders) {
-            currentY = this.addTableHeader(doc, config, currentY);
+            currentY = this.addTableHeader(doc, visibleColumns, tableWidth, currentY);
           }
         }
 
-        currentY = await this.addProductRow(doc, product, config, currentY);
+        currentY = this.addProductRow(doc, product, config, rowColumns, tableWidth, imagePaths, currentY);
+        rowsRendered++;
         
         this.reportProgress(
           'generating_pdf',
-          25 + Math.floor((groupIndex * group.products.length + productIndex + 1) / 
-            groupedData.reduce((sum, g) => sum + g.products.length, 0) * 60),
+          25 + Math.floor(rowsRendered / totalRows * 60),
           `Processing ${product.productName}...`,
           product.productName
         );
@@ -257,14 +300,11 @@ export class PDFExportService {
     return y + 25;
   }
 
-  private addTableHeader(doc: PDFKit.PDFDocument, config: PDFExportConfig, y: number): number {
-    const visibleColumns = config.columns.filter(col => col.visible);
+  private addTableHeader(doc: PDFKit.PDFDocument, visibleColumns: PDFColumnConfig[], tableWidth: number, y: number): number {
     let x = this.layout.margins.left;
 
     // Background for header
-    doc.rect(this.layout.margins.left, y, 
-             doc.page.width - this.layout.margins.left - this.layout.margins.right, 
-             20)
+    doc.rect(this.layout.margins.left, y, tableWidth, 20)
        .fillColor('#f8fafc')
        .fill();
 
@@ -280,15 +320,20 @@ export class PDFExportService {
     return y + 25;
   }
 
-  private async addProductRow(doc: PDFKit.PDFDocument, product: ProductForExport, config: PDFExportConfig, y: number): Promise<number> {
-    const visibleColumns = config.columns.filter(col => col.visible);
+  private addProductRow(
+    doc: PDFKit.PDFDocument,
+    product: ProductForExport,
+    config: PDFExportConfig,
+    rowColumns: RowColumn[],
+    tableWidth: number,
+    imagePaths: Map<string, string>,
+    y: number
+  ): number {
     let x = this.layout.margins.left;
     const rowHeight = EXPORT_CONFIG.layout.spacing.rowHeight;
 
     // Alternating row background
-    doc.rect(this.layout.margins.left, y, 
-             doc.page.width - this.layout.margins.left - this.layout.margins.right, 
-             rowHeight)
+    doc.rect(this.layout.margins.left, y, tableWidth, rowHeight)
        .fillColor('#ffffff')
        .fill();
 
@@ -296,15 +341,14 @@ export class PDFExportService {
        .font(this.layout.fonts.body)
        .fillColor(this.layout.colors.text);
 
-    for (const column of visibleColumns) {
-      const cellValue = this.getCellValue(product, column.key);
+    for (const { column, getValue } of rowColumns) {
       const cellY = y + 5;
 
       if (column.key === 'image' && config.includeImages) {
         // Add image placeholder or actual image - center it in the cell
         const imageX = x + (column.width - EXPORT_CONFIG.layout.image.width) / 2;
         const imageY = y + (rowHeight - EXPORT_CONFIG.layout.image.height) / 2;
-        await this.addProductImage(doc, product, imageX, imageY);
+        this.addProductImage(doc, imagePaths.get(product.id), imageX, imageY);
       } else if (column.key === 'url') {
         // Add hyperlink
         doc.fillColor(this.layout.colors.primary)
@@ -316,7 +360,7 @@ export class PDFExportService {
       } else {
         // Regular text
         doc.fillColor(this.layout.colors.text)
-           .text(cellValue, x + 5, cellY, { 
+           .text(getValue(product), x + 5, cellY, { 
              width: column.width - 10, 
              height: rowHeight - 10,
              ellipsis: true 
@@ -328,98 +372,73 @@ export class PDFExportService {
 
     // Add border
     doc.strokeColor(this.layout.colors.border)
-       .rect(this.layout.margins.left, y, 
-             doc.page.width - this.layout.margins.left - this.layout.margins.right, 
-             rowHeight)
+       .rect(this.layout.margins.left, y, tableWidth, rowHeight)
        .stroke();
 
     return y + rowHeight;
   }
 
-  private getCellValue(product: ProductForExport, columnKey: string): string {
-    switch (columnKey) {
-      case 'productName':
-        return product.productName || '';
-      case 'type':
-        return product.type || '';
-      case 'specificationDescription':
-        return product.specificationDescription || '';
-      case 'manufacturer':
-        return product.manufacturer || '';
-      case 'price':
-        return product.price ? `$${product.price.toFixed(2)}` : '';
-      case 'category':
-        return product.category.join(', ');
-      case 'location':
-        return product.location.join(', ');
-      case 'tagId':
-        return product.tagId || '';
-      case 'url':
-        return 'Link';
-      default:
-        return '';
+  private async resolveImagePaths(products: ProductForExport[]): Promise<Map<string, string>> {
+    const imagePaths = new Map<string, string>();
+
+    // Get the project state to access the asset manager
+    const projectState = ProjectState.getInstance();
+    const state = projectState.getStateInfo();
+
+    if (!state.isOpen || !state.filePath) {
+      return imagePaths;
     }
-  }
 
-  private async addProductImage(doc: PDFKit.PDFDocument, product: ProductForExport, x: number, y: number): Promise<void> {
-    try {
-      // console.log(`🖼️ Loading image for product: ${product.productName}`);
-      
-      // Get the project state to access the asset manager
-      const projectState = ProjectState.getInstance();
-      const state = projectState.getStateInfo();
-      
-      if (!state.isOpen || !state.filePath) {
-        this.addImagePlaceholder(doc, x, y);
-        return;
-      }
+    // The project directory is the .specbook file itself (it's actually a directory)
+    const assetManager = new AssetManager(state.filePath);
 
-      // Get the project directory from the file path
-      // The project directory is the .specbook file itself (it's actually a directory)
-      const projectDir = state.filePath;
-      
-      // Initialize asset manager
-      const assetManager = new AssetManager(projectDir);
-      
-      
-      // Try multiple image sources in order of preference
-      const imageSources = [
-        { hash: product.primaryThumbnailHash, isThumbnail: true, name: 'thumbnail' },
-        { hash: product.primaryImageHash, isThumbnail: false, name: 'primary image' }
-      ].filter(source => source.hash); // Only include sources that have hashes
-
-      if (imageSources.length === 0) {
-        this.addImagePlaceholder(doc, x, y);
-        return;
+    await Promise.all(products.map(async product => {
+      const imagePath = await this.findProductImagePath(assetManager, product);
+      if (imagePath) {
+        imagePaths.set(product.id, imagePath);
       }
+    }));
 
-      // Try each image source until we find one that works
-      for (const source of imageSources) {
-        try {
-          const imagePath = await assetManager.getAssetPath(source.hash!, source.isThumbnail);
-          
-          // Check if file exists and is readable
-          if (!fs.existsSync(imagePath)) {
-            continue;
-          }
-          // Successfully found an image, embed it
-          doc.image(imagePath, x, y, {
-            width: EXPORT_CONFIG.layout.image.width,
-            height: EXPORT_CONFIG.layout.image.height,
-            fit: [EXPORT_CONFIG.layout.image.width, EXPORT_CONFIG.layout.image.height],
-            align: 'center',
-            valign: 'center'
-          });
-          return; // Success! Exit the function
-
-        } catch (error) {
-          continue; // Try the next source
+    return imagePaths;
+  }
+
+  private async findProductImagePath(assetManager: AssetManager, product: ProductForExport): Promise<string | null> {
+    // Try multiple image sources in order of preference
+    const imageSources = [
+      { hash: product.primaryThumbnailHash, isThumbnail: true },
+      { hash: product.primaryImageHash, isThumbnail: false }
+    ].filter(source => source.hash); // Only include sources that have hashes
+
+    for (const source of imageSources) {
+      try {
+        const imagePath = await assetManager.getAssetPath(source.hash!, source.isThumbnail);
+
+        // Check if file exists and is readable
+        if (fs.existsSync(imagePath)) {
+          return imagePath;
         }
+      } catch (error) {
+        continue; // Try the next source
       }
+    }
+
+    return null;
+  }
 
-      // If we get here, none of the image sources worked
+  private addProductImage(doc: PDFKit.PDFDocument, imagePath: string | undefined, x: number, y: number): void {
+    if (!imagePath) {
       this.addImagePlaceholder(doc, x, y);
+      return;
+    }
 
+    try {
+      doc.image(imagePath, x, y, {
+        width: EXPORT_CONFIG.layout.image.width,
+        height: EXPORT_CONFIG.layout.image.height,
+        fit: [EXPORT_CONFIG.layout.image.width, EXPORT_CONFIG.layout.image.height],
+        align: 'center',
+        valign: 'center'
+      });
     } catch (error) {
       console.error('❌ Failed to load product image:', error);
       this.addImagePlaceholder(doc, x, y);
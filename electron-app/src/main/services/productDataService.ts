@@ -50,53 +50,54 @@ export class ProductDataService {
       return products;
     }
 
-    return products.filter(product => {
-      // Search filter
-      if (config.filters!.search) {
-        const searchTerm = config.filters!.search.toLowerCase();
-        const searchableText = [
-          product.productName,
-          product.type,
-          product.specificationDescription,
-          product.manufacturer,
-          product.tagId,
-          ...product.category,
-          ...product.location,
-        ].join(' ').toLowerCase();
-
-        if (!searchableText.includes(searchTerm)) {
-          return false;
-        }
-      }
+    // Lower-case each filter term once and keep only the checks that apply
+    const { search, category, location, manufacturer } = config.filters;
+    const predicates: Array<(product: ProductForExport) => boolean> = [];
+
+    // Search filter
+    if (search) {
+      const searchTerm = search.toLowerCase();
+      predicates.push(product => [
+        product.productName,
+        product.type,
+        product.specificationDescription,
+        product.manufacturer,
+        product.tagId,
+        ...product.category,
+        ...product.location,
+      ].join(' ').toLowerCase().includes(searchTerm));
+    }
 
-      // Category filter
-      if (config.filters!.category) {
-        if (!product.category.some(cat =>
-          cat.toLowerCase().includes(config.filters!.category!.toLowerCase())
-        )) {
-          return false;
-        }
-      }
+    // Category filter
+    if (category) {
+      const categoryTerm = category.toLowerCase();
+      predicates.push(product =>
+        product.category.some(cat => cat.toLowerCase().includes(categoryTerm))
+      );
+    }
 
-      // Location filter
-      if (config.filters!.location) {
-        if (!product.location.some(loc =>
-          loc.toLowerCase().includes(config.filters!.location!.toLowerCase())
-        )) {
-          return false;
-        }
-      }
+    // Location filter
+    if (location) {
+      const locationTerm = location.toLowerCase();
+      predicates.push(product =>
+        product.location.some(loc => loc.toLowerCase().includes(locationTerm))
+      );
+    }
 
-      // Manufacturer filter
-      if (config.filters!.manufacturer) {
-        if (!product.manufacturer ||
-            !product.manufacturer.toLowerCase().includes(config.filters!.manufacturer.toLowerCase())) {
-          return false;
-        }
-      }
+    // Manufacturer filter
+    if (manufacturer) {
+      const manufacturerTerm = manufacturer.toLowerCase();
+      predicates.push(product =>
+        !!product.manufacturer && product.manufacturer.toLowerCase().includes(manufacturerTerm)
+      );
+    }
 
-      return true;
-    });
+    // Nothing to filter on (e.g. all filter fields empty): skip the scan entirely
+    if (predicates.length === 0) {
+      return products;
+    }
+
+    return products.filter(product => predicates.every(predicate => predicate(product)));
   }
 
   /**
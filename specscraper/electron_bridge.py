@@ -171,7 +171,7 @@ class ElectronBridge:
 
             return {
                 "success": True,
-                "data": extracted.model_dump(),
+                "data": dict(extracted),
                 "metadata": {
                     "scrape_method": scrape_result.final_method.value,  # type: ignore[union-attr]
                     "processing_time": execution_time,
@@ -1,35 +1,149 @@
 """Cache management for HTML content to avoid re-scraping during benchmarking"""
+import gzip
 import hashlib
 import json
 import logging
 import os
 import sqlite3
+import threading
+import time
+from collections import Counter, OrderedDict
 from datetime import datetime
+from functools import lru_cache
 from pathlib import Path
 from typing import Optional, Dict, Any, List, Tuple
 import pandas as pd
 
+try:
+    import xxhash
+    XXHASH_AVAILABLE = True
+except ImportError:
+    XXHASH_AVAILABLE = False
+
 logger = logging.getLogger(__name__)
 
+# Only these llm_results.csv columns are needed; skipping the prompt and
+# response columns avoids parsing most of the file
+LLM_RESULTS_COLUMNS = frozenset({'product_url', 'success', 'html_content', 'final_method', 'status_code'})
+
+# llm_results.csv rows read and imported per batch, so only one chunk of HTML
+# is held in memory at a time
+LLM_RESULTS_CHUNK_ROWS = 500
+
+# Bound parameters per IN (...) query; older SQLite builds cap this at 999
+SQLITE_MAX_PARAMS = 900
+
+# Pages smaller than this are stored uncompressed even when compression is enabled
+COMPRESS_MIN_SIZE = 512
+
+# Seconds a connection waits on another thread's write lock before raising
+SQLITE_BUSY_TIMEOUT = 30.0
+
+# Seconds get_cache_stats results are reused; entry writes invalidate them sooner,
+# but access counts from cache hits may lag by up to this long
+CACHE_STATS_TTL = 10.0
+
+# Rows fetched per keyset page when exporting the cache manifest
+MANIFEST_PAGE_SIZE = 5000
+
+# Local time with milliseconds, stamped by SQLite; it sorts and compares with
+# stored datetime values the same way
+SQL_LOCAL_NOW = "strftime('%Y-%m-%d %H:%M:%f', 'now', 'localtime')"
+
+# Upsert that rewrites an existing entry in place; INSERT OR REPLACE would delete
+# the row and insert a new one, updating every index twice
+UPSERT_CACHE_ENTRY_SQL = f"""
+    INSERT INTO cache_entries
+    (url, cache_key, file_path, content_size, scrape_method,
+     status_code, created_at, last_accessed, access_count, from_llm_results)
+    VALUES (?, ?, ?, ?, ?, ?, {SQL_LOCAL_NOW}, {SQL_LOCAL_NOW}, 0, ?)
+    ON CONFLICT(url) DO UPDATE SET
+        cache_key = excluded.cache_key,
+        file_path = excluded.file_path,
+        content_size = excluded.content_size,
+        scrape_method = excluded.scrape_method,
+        status_code = excluded.status_code,
+        created_at = excluded.created_at,
+        last_accessed = excluded.last_accessed,
+        access_count = excluded.access_count,
+        from_llm_results = excluded.from_llm_results
+"""
+
+MANIFEST_COLUMNS = ['url', 'cache_key', 'content_size', 'scrape_method',
+                    'status_code', 'created_at', 'access_count', 'from_llm_results']
+
+
+@lru_cache(maxsize=4096)
+def _url_cache_key(url: str) -> str:
+    """Hash a URL into its cache key, memoized since the same URLs recur across runs"""
+    # 128-bit non-cryptographic hash; same 32-char hex shape as the BLAKE2b fallback
+    if XXHASH_AVAILABLE:
+        return xxhash.xxh3_128_hexdigest(url.encode())
+    return hashlib.blake2b(url.encode(), digest_size=16).hexdigest()
+
 
 class CacheManager:
     """Manages cached HTML content for benchmarking"""
     
-    def __init__(self, cache_dir: str = "shared/cache", llm_results_path: str = "shared/data/reference_data/llm_results.csv"):
+    def __init__(self, cache_dir: str = "shared/cache", llm_results_path: str = "shared/data/reference_data/llm_results.csv",
+                 memory_cache_size: int = 1000, access_flush_threshold: int = 100,
+                 compress_html: bool = False, stats_ttl: float = CACHE_STATS_TTL):
         self.cache_dir = Path(cache_dir)
         self.cache_dir.mkdir(exist_ok=True, parents=True)
         self.llm_results_path = Path(llm_results_path)
+        self.compress_html = compress_html
+        self._llm_results_index: Optional[Tuple[int, frozenset]] = None
         
-        # SQLite database for cache metadata
+        # SQLite database for cache metadata, with one reused connection per thread
         self.db_path = self.cache_dir / "cache.db"
+        self._local = threading.local()
+        self._connections: List[sqlite3.Connection] = []
+        self._connections_lock = threading.Lock()
         self._init_db()
         
-        # In-memory cache for performance
-        self._memory_cache: Dict[str, str] = {}
+        # In-memory LRU cache for performance, bounded to memory_cache_size entries;
+        # locked because scraping and benchmark workers share it across threads
+        self.memory_cache_size = memory_cache_size
+        self._memory_cache: "OrderedDict[str, str]" = OrderedDict()
+        self._memory_lock = threading.Lock()
+        
+        # Access stats are buffered and written in batches rather than per hit
+        self.access_flush_threshold = access_flush_threshold
+        self._pending_access: Dict[str, Tuple[int, str]] = {}
+        self._pending_lock = threading.Lock()
+        
+        # Recent get_cache_stats result as (monotonic time, stats); the lock makes
+        # concurrent callers wait for one recomputation instead of each querying
+        self.stats_ttl = stats_ttl
+        self._stats_cache: Optional[Tuple[float, Dict[str, Any]]] = None
+        self._stats_lock = threading.Lock()
         
+    def _connect(self) -> sqlite3.Connection:
+        """Return this thread's SQLite connection, opening it on first use"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=SQLITE_BUSY_TIMEOUT, check_same_thread=False)
+            # WAL makes commits durable at checkpoints, so per-commit fsyncs can be skipped
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            with self._connections_lock:
+                self._connections.append(conn)
+        return conn
+    
+    def close(self):
+        """Flush pending stats and close all SQLite connections"""
+        self.flush_access_stats()
+        with self._connections_lock:
+            connections, self._connections = self._connections, []
+            self._local = threading.local()
+        for conn in connections:
+            conn.close()
+    
     def _init_db(self):
         """Initialize SQLite database for cache metadata"""
-        with sqlite3.connect(self.db_path) as conn:
+        with self._connect() as conn:
+            # Persistent per database file; lets readers proceed while a writer commits
+            conn.execute("PRAGMA journal_mode=WAL")
             conn.execute("""
                 CREATE TABLE IF NOT EXISTS cache_entries (
                     url TEXT PRIMARY KEY,
@@ -50,13 +164,18 @@ class CacheManager:
             conn.execute("""
                 CREATE INDEX IF NOT EXISTS idx_created_at ON cache_entries(created_at)
             """)
+            # Covering index for the most-accessed query: it walks the index in order
+            # and stops at LIMIT without sorting or touching the table
+            conn.execute("""
+                CREATE INDEX IF NOT EXISTS idx_access_count ON cache_entries(access_count DESC, url)
+            """)
             conn.commit()
             
         logger.info(f"Initialized cache database at {self.db_path}")
     
     def get_cache_key(self, url: str) -> str:
         """Generate cache key from URL"""
-        return hashlib.md5(url.encode()).hexdigest()
+        return _url_cache_key(url)
     
     def check_llm_results(self, url: str) -> bool:
         """Check if URL exists in llm_results.csv with successful scraping"""
@@ -64,21 +183,25 @@ class CacheManager:
             return False
             
         try:
-            df = pd.read_csv(self.llm_results_path)
-            # Check if URL exists and was successfully scraped
-            url_data = df[df['product_url'] == url]
-            if not url_data.empty:
-                # Check if scraping was successful
-                success = url_data.iloc[0].get('success', False)
-                has_content = pd.notna(url_data.iloc[0].get('html_content', None))
-                return success and has_content
+            return url in self._get_llm_results_urls()
         except Exception as e:
             logger.warning(f"Error checking llm_results.csv: {e}")
             
         return False
     
-    def import_from_llm_results(self, force: bool = False) -> int:
-        """Import HTML content from llm_results.csv into cache"""
+    def _get_llm_results_urls(self) -> frozenset:
+        """Return successfully scraped URLs from llm_results.csv, re-reading only when the file changes"""
+        mtime = self.llm_results_path.stat().st_mtime_ns
+        if self._llm_results_index is None or self._llm_results_index[0] != mtime:
+            df = pd.read_csv(self.llm_results_path, usecols=lambda col: col in LLM_RESULTS_COLUMNS)
+            # The first row for each URL decides, as in a per-URL lookup
+            df = df.drop_duplicates(subset='product_url', keep='first')
+            successful = df[(df['success'] == True) & df['html_content'].notna()]
+            self._llm_results_index = (mtime, frozenset(successful['product_url']))
+        return self._llm_results_index[1]
+    
+    def import_from_llm_results(self, force: bool = False, chunk_rows: int = LLM_RESULTS_CHUNK_ROWS) -> int:
+        """Import HTML content from llm_results.csv into cache, chunk_rows rows at a time"""
         if not self.llm_results_path.exists():
             logger.warning(f"LLM results file not found: {self.llm_results_path}")
             return 0
@@ -86,27 +209,42 @@ class CacheManager:
         imported_count = 0
         
         try:
-            df = pd.read_csv(self.llm_results_path)
-            successful_results = df[df['success'] == True]
+            # Look up already cached URLs with one query instead of one per row
+            existing_urls = set()
+            if not force:
+                with self._connect() as conn:
+                    existing_urls = {url for (url,) in conn.execute("SELECT url FROM cache_entries")}
             
-            for _, row in successful_results.iterrows():
-                url = row['product_url']
-                html_content = row.get('html_content', '')
+            chunks = pd.read_csv(self.llm_results_path, usecols=lambda col: col in LLM_RESULTS_COLUMNS,
+                                 chunksize=chunk_rows)
+            for df in chunks:
+                successful_results = df[df['success'] == True]
                 
-                if pd.notna(html_content) and html_content:
-                    # Check if already cached and skip if not forcing
-                    if not force and self.has_cached(url):
-                        continue
-                        
-                    # Store in cache
-                    metadata = {
-                        'scrape_method': row.get('final_method', 'unknown'),
-                        'status_code': row.get('status_code', 200),
-                        'from_llm_results': True
-                    }
+                # Without force the first row for a URL is kept; with force every row
+                # is imported, so the last one wins as with per-row stores
+                entries = {}
+                row_counts = Counter()
+                for row in successful_results.to_dict('records'):
+                    url = row['product_url']
+                    html_content = row.get('html_content', '')
                     
-                    self.store_html(url, html_content, metadata)
-                    imported_count += 1
+                    if pd.notna(html_content) and html_content:
+                        # Skip already cached URLs if not forcing
+                        if url in existing_urls or (not force and url in entries):
+                            continue
+                        entries[url] = (url, html_content, {
+                            'scrape_method': row.get('final_method', 'unknown'),
+                            'status_code': row.get('status_code', 200),
+                            'from_llm_results': True
+                        })
+                        row_counts[url] += 1
+                
+                # Store each chunk's entries with a single metadata transaction; a URL
+                # counts as cached only once its store has succeeded
+                stored_urls = self._store_html_entries(list(entries.values()))
+                if not force:
+                    existing_urls.update(stored_urls)
+                imported_count += sum(row_counts[url] for url in stored_urls)
                     
             logger.info(f"Imported {imported_count} HTML documents from llm_results.csv")
             
@@ -118,64 +256,60 @@ class CacheManager:
     def get_cached_html(self, url: str) -> Optional[str]:
         """Retrieve cached HTML content for a URL"""
         # Check memory cache first
-        if url in self._memory_cache:
+        content = self._get_from_memory(url)
+        if content is not None:
             self._update_access_stats(url)
-            return self._memory_cache[url]
+            return content
         
-        # Check database
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.execute(
+        # Check database; the file is read after the connection block
+        with self._connect() as conn:
+            result = conn.execute(
                 "SELECT file_path FROM cache_entries WHERE url = ?",
                 (url,)
-            )
-            result = cursor.fetchone()
+            ).fetchone()
             
-            if result:
-                file_path = Path(result[0])
-                if file_path.exists():
-                    try:
-                        content = file_path.read_text(encoding='utf-8')
-                        # Update memory cache
-                        self._memory_cache[url] = content
-                        self._update_access_stats(url)
-                        return content
-                    except Exception as e:
-                        logger.error(f"Error reading cached file {file_path}: {e}")
+        if result:
+            file_path = Path(result[0])
+            if file_path.exists():
+                try:
+                    content = self._read_html(file_path)
+                    # Update memory cache
+                    self._put_in_memory(url, content)
+                    self._update_access_stats(url)
+                    return content
+                except Exception as e:
+                    logger.error(f"Error reading cached file {file_path}: {e}")
                         
         return None
     
     def store_html(self, url: str, html_content: str, metadata: Optional[Dict[str, Any]] = None) -> bool:
         """Store HTML content in cache"""
         cache_key = self.get_cache_key(url)
-        file_path = self.cache_dir / f"{cache_key}.html"
+        file_path = self._html_path(cache_key, html_content)
         
         try:
-            # Write HTML content to file
-            file_path.write_text(html_content, encoding='utf-8')
+            # Write HTML content to file, skipping the rewrite when the content is unchanged
+            if not self._memory_holds(url, html_content) or not file_path.exists():
+                self._write_html(file_path, html_content)
             
-            # Store metadata in database
-            with sqlite3.connect(self.db_path) as conn:
-                conn.execute("""
-                    INSERT OR REPLACE INTO cache_entries 
-                    (url, cache_key, file_path, content_size, scrape_method, 
-                     status_code, created_at, last_accessed, access_count, from_llm_results)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                """, (
+            # Store metadata in database; the replaced row starts with fresh access stats
+            with self._pending_lock:
+                self._pending_access.pop(url, None)
+            with self._connect() as conn:
+                conn.execute(UPSERT_CACHE_ENTRY_SQL, (
                     url,
                     cache_key,
                     str(file_path),
                     len(html_content),
                     metadata.get('scrape_method', 'unknown') if metadata else 'unknown',
                     metadata.get('status_code', 200) if metadata else 200,
-                    datetime.now(),
-                    datetime.now(),
-                    0,
                     metadata.get('from_llm_results', False) if metadata else False
                 ))
                 conn.commit()
+            self._invalidate_stats()
             
             # Update memory cache
-            self._memory_cache[url] = html_content
+            self._put_in_memory(url, html_content)
             
             logger.debug(f"Cached HTML for {url} ({len(html_content)} bytes)")
             return True
@@ -184,12 +318,56 @@ class CacheManager:
             logger.error(f"Error caching HTML for {url}: {e}")
             return False
     
+    def store_html_batch(self, entries: List[Tuple[str, str, Optional[Dict[str, Any]]]]) -> int:
+        """Store several (url, html, metadata) entries with one metadata transaction"""
+        return len(self._store_html_entries(entries))
+    
+    def _store_html_entries(self, entries: List[Tuple[str, str, Optional[Dict[str, Any]]]]) -> List[str]:
+        """Store (url, html, metadata) entries in one transaction, returning the URLs stored"""
+        rows = []
+        stored = []
+        for url, html_content, metadata in entries:
+            metadata = metadata or {}
+            cache_key = self.get_cache_key(url)
+            file_path = self._html_path(cache_key, html_content)
+            try:
+                if not self._memory_holds(url, html_content) or not file_path.exists():
+                    self._write_html(file_path, html_content)
+            except Exception as e:
+                logger.error(f"Error caching HTML for {url}: {e}")
+                continue
+            rows.append((
+                url, cache_key, str(file_path), len(html_content),
+                metadata.get('scrape_method', 'unknown'), metadata.get('status_code', 200),
+                metadata.get('from_llm_results', False)
+            ))
+            stored.append((url, html_content))
+        
+        if not rows:
+            return []
+        
+        # Replaced rows start with fresh access stats
+        with self._pending_lock:
+            for url, _ in stored:
+                self._pending_access.pop(url, None)
+        with self._connect() as conn:
+            conn.executemany(UPSERT_CACHE_ENTRY_SQL, rows)
+            conn.commit()
+        self._invalidate_stats()
+        
+        for url, html_content in stored:
+            self._put_in_memory(url, html_content)
+        
+        logger.debug(f"Cached {len(rows)} HTML documents in one batch")
+        return [url for url, _ in stored]
+    
     def has_cached(self, url: str) -> bool:
         """Check if URL has cached content"""
-        if url in self._memory_cache:
-            return True
+        with self._memory_lock:
+            if url in self._memory_cache:
+                return True
             
-        with sqlite3.connect(self.db_path) as conn:
+        with self._connect() as conn:
             cursor = conn.execute(
                 "SELECT COUNT(*) FROM cache_entries WHERE url = ?",
                 (url,)
@@ -198,18 +376,34 @@ class CacheManager:
             return count > 0
     
     def get_cache_stats(self) -> Dict[str, Any]:
-        """Get cache statistics"""
-        with sqlite3.connect(self.db_path) as conn:
-            # Total entries
-            total_entries = conn.execute("SELECT COUNT(*) FROM cache_entries").fetchone()[0]
-            
-            # Total size
-            total_size = conn.execute("SELECT SUM(content_size) FROM cache_entries").fetchone()[0] or 0
-            
-            # Entries by source
-            from_llm_results = conn.execute(
-                "SELECT COUNT(*) FROM cache_entries WHERE from_llm_results = 1"
-            ).fetchone()[0]
+        """Get cache statistics, reusing a recent result for up to stats_ttl seconds"""
+        with self._stats_lock:
+            cached = self._stats_cache
+            if cached is None or time.monotonic() - cached[0] >= self.stats_ttl:
+                cached = (time.monotonic(), self._compute_cache_stats())
+                self._stats_cache = cached
+        return {**cached[1], "memory_cache_size": len(self._memory_cache)}
+    
+    def _invalidate_stats(self):
+        """Drop cached stats after a write"""
+        # Taken under the lock so a recompute already in flight, which may have read
+        # the table before this write, cannot store its stale totals afterwards
+        with self._stats_lock:
+            self._stats_cache = None
+    
+    def _compute_cache_stats(self) -> Dict[str, Any]:
+        """Query cache statistics from the database"""
+        self.flush_access_stats()
+        with self._connect() as conn:
+            # Totals, entries by source and cache age in one aggregate pass
+            total_entries, total_size, from_llm_results, oldest, newest = conn.execute("""
+                SELECT COUNT(*),
+                       COALESCE(SUM(content_size), 0),
+                       COALESCE(SUM(from_llm_results = 1), 0),
+                       MIN(created_at),
+                       MAX(created_at)
+                FROM cache_entries
+            """).fetchone()
             
             # Most accessed
             most_accessed = conn.execute("""
@@ -218,15 +412,6 @@ class CacheManager:
                 ORDER BY access_count DESC 
                 LIMIT 10
             """).fetchall()
-            
-            # Cache age
-            oldest = conn.execute(
-                "SELECT MIN(created_at) FROM cache_entries"
-            ).fetchone()[0]
-            
-            newest = conn.execute(
-                "SELECT MAX(created_at) FROM cache_entries"
-            ).fetchone()[0]
         
         return {
             "total_entries": total_entries,
@@ -236,95 +421,215 @@ class CacheManager:
             "most_accessed": [{"url": url, "count": count} for url, count in most_accessed],
             "oldest_entry": oldest,
             "newest_entry": newest,
-            "memory_cache_size": len(self._memory_cache)
         }
     
     def clear_memory_cache(self):
         """Clear in-memory cache"""
-        self._memory_cache.clear()
+        with self._memory_lock:
+            self._memory_cache.clear()
         logger.info("Cleared memory cache")
     
     def cleanup_old_entries(self, days: int = 30):
         """Remove cache entries older than specified days"""
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.execute("""
+        self.flush_access_stats()
+        # created_at is stored as local time, so SQLite computes a local cutoff
+        # from the day offset; the range predicate is served by idx_created_at
+        with self._connect() as conn:
+            deleted = conn.execute("""
                 DELETE FROM cache_entries 
-                WHERE created_at < datetime('now', '-{} days')
-                RETURNING file_path
-            """.format(days))
-            
-            # Delete files
-            deleted_count = 0
-            for (file_path,) in cursor.fetchall():
-                try:
-                    Path(file_path).unlink(missing_ok=True)
-                    deleted_count += 1
-                except Exception as e:
-                    logger.error(f"Error deleting cache file {file_path}: {e}")
-                    
+                WHERE created_at < strftime('%Y-%m-%d %H:%M:%f', 'now', 'localtime', ?)
+                RETURNING url, file_path
+            """, (f"{-days} days",)).fetchall()
             conn.commit()
+        self._invalidate_stats()
+            
+        # Delete files once the write lock is released, so other writers aren't
+        # blocked on file system work
+        deleted_count = 0
+        for url, file_path in deleted:
+            with self._memory_lock:
+                self._memory_cache.pop(url, None)
+            try:
+                Path(file_path).unlink(missing_ok=True)
+                deleted_count += 1
+            except Exception as e:
+                logger.error(f"Error deleting cache file {file_path}: {e}")
             
         logger.info(f"Cleaned up {deleted_count} old cache entries")
         return deleted_count
     
     def export_cache_manifest(self, output_path: str):
         """Export cache manifest to CSV"""
-        with sqlite3.connect(self.db_path) as conn:
-            df = pd.read_sql_query("""
-                SELECT url, cache_key, content_size, scrape_method, 
-                       status_code, created_at, access_count, from_llm_results
-                FROM cache_entries
-                ORDER BY created_at DESC
-            """, conn)
-            
-        df.to_csv(output_path, index=False)
+        self.flush_access_stats()
+        # Written page by page so the whole manifest is never held in memory
+        header = True
+        for page in self._iter_manifest_pages():
+            pd.DataFrame(page, columns=MANIFEST_COLUMNS).to_csv(
+                output_path, index=False, header=header, mode='w' if header else 'a')
+            header = False
+        if header:
+            pd.DataFrame(columns=MANIFEST_COLUMNS).to_csv(output_path, index=False)
         logger.info(f"Exported cache manifest to {output_path}")
         return output_path
     
+    def _iter_manifest_pages(self, page_size: int = MANIFEST_PAGE_SIZE):
+        """Yield manifest rows newest first, one keyset page at a time"""
+        # Each page resumes after the last (created_at, rowid) seen, so it is a
+        # bounded range scan of idx_created_at however deep the export gets
+        conn = self._connect()
+        select = f"SELECT {', '.join(MANIFEST_COLUMNS)}, rowid FROM cache_entries"
+        yield from self._iter_keyset_pages(
+            conn, f"{select} WHERE created_at IS NOT NULL", "(created_at, rowid) < (?, ?)",
+            "created_at DESC, rowid DESC", lambda row: (row[5], row[-1]), page_size
+        )
+        # Undated entries sort last, as under ORDER BY created_at DESC; the row
+        # comparison is never true for a NULL created_at, so they page by rowid alone
+        yield from self._iter_keyset_pages(
+            conn, f"{select} WHERE created_at IS NULL", "rowid < ?",
+            "rowid DESC", lambda row: (row[-1],), page_size
+        )
+    
+    @staticmethod
+    def _iter_keyset_pages(conn: sqlite3.Connection, select: str, after: str, order_by: str,
+                           cursor, page_size: int):
+        """Yield pages of select in order_by order, resuming each after the cursor of the last row"""
+        rows = conn.execute(f"{select} ORDER BY {order_by} LIMIT ?", (page_size,)).fetchall()
+        while rows:
+            yield [row[:-1] for row in rows]
+            if len(rows) < page_size:
+                return
+            rows = conn.execute(
+                f"{select} AND {after} ORDER BY {order_by} LIMIT ?", (*cursor(rows[-1]), page_size)
+            ).fetchall()
+    
+    def _html_path(self, cache_key: str, html_content: str) -> Path:
+        """Get the cache file path, using .html.gz for pages that get compressed"""
+        if self.compress_html and len(html_content) >= COMPRESS_MIN_SIZE:
+            return self.cache_dir / f"{cache_key}.html.gz"
+        return self.cache_dir / f"{cache_key}.html"
+    
+    def _write_html(self, file_path: Path, html_content: str):
+        """Write HTML to a cache file, gzip-compressed for .gz paths"""
+        if file_path.suffix == '.gz':
+            file_path.write_bytes(gzip.compress(html_content.encode('utf-8'), compresslevel=1))
+            # Remove any uncompressed copy left from before compression was enabled
+            file_path.with_suffix('').unlink(missing_ok=True)
+        else:
+            file_path.write_text(html_content, encoding='utf-8')
+    
+    def _read_html(self, file_path: Path) -> str:
+        """Read HTML from a cache file, handling both plain and gzip files"""
+        if file_path.suffix == '.gz':
+            return gzip.decompress(file_path.read_bytes()).decode('utf-8')
+        return file_path.read_text(encoding='utf-8')
+    
+    def _get_from_memory(self, url: str) -> Optional[str]:
+        """Return memory-cached content and mark it most recently used"""
+        with self._memory_lock:
+            content = self._memory_cache.get(url)
+            if content is not None:
+                self._memory_cache.move_to_end(url)
+            return content
+    
+    def _memory_holds(self, url: str, content: str) -> bool:
+        """Check whether the memory cache already holds this content for url"""
+        with self._memory_lock:
+            return self._memory_cache.get(url) == content
+    
+    def _put_in_memory(self, url: str, content: str):
+        """Add content to the memory cache, evicting the least recently used entry"""
+        with self._memory_lock:
+            self._memory_cache[url] = content
+            self._memory_cache.move_to_end(url)
+            if len(self._memory_cache) > self.memory_cache_size:
+                self._memory_cache.popitem(last=False)
+    
     def _update_access_stats(self, url: str):
-        """Update access statistics for a cache entry"""
-        with sqlite3.connect(self.db_path) as conn:
-            conn.execute("""
+        """Record a cache hit, flushing buffered stats once the threshold is reached"""
+        with self._pending_lock:
+            count, _ = self._pending_access.get(url, (0, None))
+            # Same text layout as SQL_LOCAL_NOW, so last_accessed sorts consistently
+            self._pending_access[url] = (count + 1, datetime.now().isoformat(sep=' ', timespec='milliseconds'))
+            should_flush = len(self._pending_access) >= self.access_flush_threshold
+        if should_flush:
+            self.flush_access_stats()
+    
+    def flush_access_stats(self):
+        """Write buffered access statistics to the database in one transaction"""
+        with self._pending_lock:
+            if not self._pending_access:
+                return
+            pending, self._pending_access = self._pending_access, {}
+        with self._connect() as conn:
+            conn.executemany("""
                 UPDATE cache_entries 
-                SET last_accessed = ?, access_count = access_count + 1
+                SET last_accessed = ?, access_count = access_count + ?
                 WHERE url = ?
-            """, (datetime.now(), url))
+            """, [(last_accessed, count, url) for url, (count, last_accessed) in pending.items()])
             conn.commit()
     
     def get_batch_cached_html(self, urls: List[str]) -> Dict[str, Optional[str]]:
         """Get cached HTML for multiple URLs efficiently"""
         results = {}
         
-        # Check memory cache first
-        for url in urls:
-            if url in self._memory_cache:
-                results[url] = self._memory_cache[url]
-                self._update_access_stats(url)
+        # Check memory cache first, under one lock acquisition for the whole batch
+        with self._memory_lock:
+            for url in urls:
+                content = self._memory_cache.get(url)
+                if content is not None:
+                    self._memory_cache.move_to_end(url)
+                    results[url] = content
+        for url in results:
+            self._update_access_stats(url)
         
-        # Get remaining from disk
+        # Get remaining from disk; files are read after the lookup's connection block
         remaining_urls = [url for url in urls if url not in results]
-        if remaining_urls:
-            with sqlite3.connect(self.db_path) as conn:
-                placeholders = ','.join('?' * len(remaining_urls))
-                cursor = conn.execute(f"""
-                    SELECT url, file_path 
-                    FROM cache_entries 
-                    WHERE url IN ({placeholders})
-                """, remaining_urls)
-                
-                for url, file_path in cursor.fetchall():
-                    try:
-                        content = Path(file_path).read_text(encoding='utf-8')
-                        results[url] = content
-                        self._memory_cache[url] = content
-                        self._update_access_stats(url)
-                    except Exception as e:
-                        logger.error(f"Error reading cached file for {url}: {e}")
-                        results[url] = None
+        file_paths = self._lookup_file_paths(remaining_urls) if remaining_urls else {}
+        for url, file_path in file_paths.items():
+            try:
+                content = self._read_html(Path(file_path))
+                results[url] = content
+                self._put_in_memory(url, content)
+                self._update_access_stats(url)
+            except Exception as e:
+                logger.error(f"Error reading cached file for {url}: {e}")
+                results[url] = None
         
         # Set None for URLs not in cache
         for url in urls:
             if url not in results:
                 results[url] = None
                 
-        return results
\ No newline at end of file
+        return results
+    
+    def get_batch_cached_paths(self, urls: List[str]) -> Dict[str, str]:
+        """Look up cache file paths for several URLs without reading the files"""
+        return self._lookup_file_paths(urls) if urls else {}
+    
+    def read_cached_file(self, url: str, file_path: str) -> Optional[str]:
+        """Read one page found by get_batch_cached_paths, preferring the memory cache"""
+        content = self._get_from_memory(url)
+        if content is None:
+            try:
+                content = self._read_html(Path(file_path))
+            except Exception as e:
+                logger.error(f"Error reading cached file for {url}: {e}")
+                return None
+            self._put_in_memory(url, content)
+        self._update_access_stats(url)
+        return content
+    
+    def _lookup_file_paths(self, urls: List[str]) -> Dict[str, str]:
+        """Map cached URLs to their file paths with chunked IN (...) queries"""
+        paths = {}
+        with self._connect() as conn:
+            # Chunked to stay under SQLite's bound-parameter limit
+            for start in range(0, len(urls), SQLITE_MAX_PARAMS):
+                chunk = urls[start:start + SQLITE_MAX_PARAMS]
+                placeholders = ','.join('?' * len(chunk))
+                paths.update(conn.execute(f"""
+                    SELECT url, file_path 
+                    FROM cache_entries 
+                    WHERE url IN ({placeholders})
+                """, chunk).fetchall())
+        return paths
@@ -1,12 +1,23 @@
 """Experiment runner for benchmarking different LLM models and prompts"""
+import hashlib
 import json
 import logging
+import threading
 import time
+from bisect import bisect_left
+from collections import Counter, OrderedDict
 from datetime import datetime
 from pathlib import Path
-from typing import List, Dict, Any, Optional
+from statistics import fmean
+from typing import List, Dict, Any, Iterator, Optional, Tuple
 import pandas as pd
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
+
+try:
+    import xxhash
+    XXHASH_AVAILABLE = True
+except ImportError:
+    XXHASH_AVAILABLE = False
 
 from ..core.html_processor import HTMLProcessor
 from ..core.llm import PromptTemplator, LLMInvocator
@@ -23,6 +34,23 @@ from .models import (
 
 logger = logging.getLogger(__name__)
 
+# Quality score buckets; each upper edge is inclusive
+QUALITY_BUCKET_EDGES = (0.2, 0.4, 0.6, 0.8)
+QUALITY_BUCKET_LABELS = ("0.0-0.2", "0.2-0.4", "0.4-0.6", "0.6-0.8", "0.8-1.0")
+
+# Rendered prompts kept for reuse across model comparisons
+PROMPT_CACHE_SIZE = 256
+
+# Newly scraped pages buffered before they are written to the cache in one batch
+SCRAPE_CACHE_FLUSH_SIZE = 50
+
+
+def _html_digest(html_content: str) -> str:
+    """Hash page HTML into a compact cache key"""
+    if XXHASH_AVAILABLE:
+        return xxhash.xxh3_128_hexdigest(html_content.encode())
+    return hashlib.blake2b(html_content.encode(), digest_size=16).hexdigest()
+
 
 class ExperimentRunner:
     """Runs experiments to compare different models and prompts"""
@@ -39,6 +67,20 @@ class ExperimentRunner:
         self.scraper = StealthScraper()
         self.evaluator = ProductExtractionEvaluator()
         
+        # In-flight HTML fetches, so concurrent workers share one scrape per URL
+        self._inflight_html: Dict[str, Future] = {}
+        self._inflight_lock = threading.Lock()
+        
+        # Prompts keyed by (url, html digest), so model comparisons clean each page
+        # once without the cache pinning every raw page in memory
+        self._prompt_cache: OrderedDict = OrderedDict()
+        self._prompt_lock = threading.Lock()
+        
+        # Scraped pages not yet written to the cache, keyed by URL so a repeat
+        # of the URL in the same run is served from here instead of re-scraped
+        self._scraped_html: Dict[str, Tuple[str, Dict[str, Any]]] = {}
+        self._scraped_lock = threading.Lock()
+        
         # Model pricing (per 1K tokens)
         self.model_pricing = {
             "gpt-4o-mini": {"input": 0.00015, "output": 0.0006},
@@ -64,31 +106,18 @@ class ExperimentRunner:
         started_at = datetime.now()
         
         # Process URLs in parallel
-        with ThreadPoolExecutor(max_workers=max_workers) as executor:
-            future_to_url = {
-                executor.submit(self._process_single_url, url, config, use_cache): url 
-                for url in urls
-            }
+        for result in self.iter_results(config, urls, use_cache, max_workers):
+            results.append(result)
             
-            for future in as_completed(future_to_url):
-                url = future_to_url[future]
-                try:
-                    result = future.result()
-                    results.append(result)
-                    
-                    # Log progress
-                    if len(results) % 10 == 0:
-                        logger.info(f"Processed {len(results)}/{len(urls)} URLs")
-                        
-                except Exception as e:
-                    logger.error(f"Error processing {url}: {e}")
-                    # Create failed result
-                    results.append(self._create_failed_result(url, config, str(e)))
+            # Log progress
+            if len(results) % 10 == 0:
+                logger.info(f"Processed {len(results)}/{len(urls)} URLs")
         
         completed_at = datetime.now()
         
         # End monitoring
         self.monitor.end_execution()
+        self.cache_manager.flush_access_stats()
         
         # Calculate summary statistics
         summary = self._create_experiment_summary(
@@ -107,6 +136,42 @@ class ExperimentRunner:
         
         return summary
     
+    def iter_results(self, config: ExperimentConfig, urls: List[str],
+                     use_cache: bool = True, max_workers: int = 5) -> Iterator[ExperimentResult]:
+        """Process URLs in parallel, yielding each result as soon as it completes"""
+        # Look up every cached page's file in one batch query; each worker reads its
+        # own file when it starts, so no page is loaded before its task runs
+        cached_paths = self.cache_manager.get_batch_cached_paths(urls) if use_cache else {}
+        
+        try:
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                future_to_url = {
+                    executor.submit(self._process_single_url, url, config, use_cache, cached_paths.get(url)): url 
+                    for url in urls
+                }
+                
+                for future in as_completed(future_to_url):
+                    url = future_to_url[future]
+                    try:
+                        result = future.result()
+                    except Exception as e:
+                        logger.error(f"Error processing {url}: {e}")
+                        # Create failed result
+                        result = self._create_failed_result(url, config, str(e))
+                    yield result
+        finally:
+            self.flush_scraped_html()
+    
+    def flush_scraped_html(self):
+        """Write buffered scraped pages to the cache in one batch"""
+        with self._scraped_lock:
+            if not self._scraped_html:
+                return
+            scraped, self._scraped_html = self._scraped_html, {}
+        self.cache_manager.store_html_batch(
+            [(url, html_content, metadata) for url, (html_content, metadata) in scraped.items()]
+        )
+    
     def run_model_comparison(self, urls: List[str], models: List[str], 
                            prompt_template: str = "default",
                            use_cache: bool = True) -> Dict[str, ExperimentSummary]:
@@ -125,36 +190,94 @@ class ExperimentRunner:
             
         return summaries
     
-    def _process_single_url(self, url: str, config: ExperimentConfig, 
-                          use_cache: bool) -> ExperimentResult:
-        """Process a single URL for benchmarking"""
-        start_time = time.time()
+    def _build_prompt(self, url: str, html_content: str) -> str:
+        """Return the extraction prompt for a page, reusing it while the HTML is unchanged"""
+        key = (url, _html_digest(html_content))
+        with self._prompt_lock:
+            prompt = self._prompt_cache.get(key)
+            if prompt is not None:
+                self._prompt_cache.move_to_end(key)
+                return prompt
+        
+        prompt = self._build_prompt_uncached(url, html_content)
+        with self._prompt_lock:
+            self._prompt_cache[key] = prompt
+            if len(self._prompt_cache) > PROMPT_CACHE_SIZE:
+                self._prompt_cache.popitem(last=False)
+        return prompt
+    
+    def _build_prompt_uncached(self, url: str, html_content: str) -> str:
+        """Clean HTML and render the extraction prompt for a URL"""
+        cleaned_html = self.html_processor.clean_html(html_content)
+        return self.prompt_templator.product_extraction(
+            url, cleaned_html.model_dump_json()
+        )
+    
+    def _get_html(self, url: str, use_cache: bool) -> str:
+        """Get HTML for a URL, joining any fetch of the same URL already in flight"""
+        with self._inflight_lock:
+            future = self._inflight_html.get(url)
+            is_owner = future is None
+            if is_owner:
+                future = Future()
+                self._inflight_html[url] = future
+        
+        if not is_owner:
+            return future.result()
         
         try:
-            # Step 1: Get HTML (from cache or scrape)
-            html_content = None
-            if use_cache:
-                html_content = self.cache_manager.get_cached_html(url)
-                
-            if not html_content:
-                logger.debug(f"Scraping {url} (not in cache)")
-                scrape_result = self.scraper.scrape_url(url)
-                
-                if scrape_result.success and scrape_result.content:
-                    html_content = scrape_result.content
-                    # Cache for future use
-                    self.cache_manager.store_html(url, html_content, {
+            html_content = self._fetch_html(url, use_cache)
+            future.set_result(html_content)
+            return html_content
+        except Exception as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._inflight_lock:
+                self._inflight_html.pop(url, None)
+    
+    def _fetch_html(self, url: str, use_cache: bool) -> str:
+        """Get HTML from cache or scrape it"""
+        html_content = None
+        if use_cache:
+            with self._scraped_lock:
+                buffered = self._scraped_html.get(url)
+            html_content = buffered[0] if buffered else self.cache_manager.get_cached_html(url)
+            
+        if not html_content:
+            logger.debug(f"Scraping {url} (not in cache)")
+            scrape_result = self.scraper.scrape_url(url)
+            
+            if scrape_result.success and scrape_result.content:
+                html_content = scrape_result.content
+                # Buffered for the cache; written in batches rather than one commit per page
+                with self._scraped_lock:
+                    self._scraped_html[url] = (html_content, {
                         'scrape_method': scrape_result.final_method.value,
                         'status_code': scrape_result.status_code
                     })
-                else:
-                    raise Exception(f"Failed to scrape: {scrape_result.error_reason}")
+                    should_flush = len(self._scraped_html) >= SCRAPE_CACHE_FLUSH_SIZE
+                if should_flush:
+                    self.flush_scraped_html()
+            else:
+                raise Exception(f"Failed to scrape: {scrape_result.error_reason}")
+        
+        return html_content
+    
+    def _process_single_url(self, url: str, config: ExperimentConfig, 
+                          use_cache: bool, cached_path: Optional[str] = None) -> ExperimentResult:
+        """Process a single URL for benchmarking"""
+        start_time = time.time()
+        
+        try:
+            # Step 1: Get HTML (from the prefetched cache file, or fetched/scraped now)
+            html_content = (
+                (cached_path and self.cache_manager.read_cached_file(url, cached_path))
+                or self._get_html(url, use_cache)
+            )
             
             # Step 2: Process HTML and generate prompt
-            cleaned_html = self.html_processor.clean_html(html_content)
-            prompt = self.prompt_templator.product_extraction(
-                url, cleaned_html.model_dump_json()
-            )
+            prompt = self._build_prompt(url, html_content)
             
             # Step 3: Call LLM
             llm_start = time.time()
@@ -167,18 +290,23 @@ class ExperimentRunner:
             )
             llm_time = time.time() - llm_start
             
-            # Step 4: Parse and validate response
+            # Step 4: Parse the response once, then validate it against the output model
+            response_data = None
             try:
-                extracted_data = PromptTemplator.ProductExtractionOutput.model_validate_json(raw_response)
+                response_data = json.loads(raw_response)
+                extracted_data = PromptTemplator.ProductExtractionOutput.model_validate(response_data)
                 extraction_successful = True
-                extracted_dict = extracted_data.model_dump()
+                extracted_dict = dict(extracted_data)
             except Exception as e:
                 logger.warning(f"Failed to parse LLM response: {e}")
                 extraction_successful = False
                 extracted_dict = {"error": str(e)}
             
-            # Step 5: Evaluate quality
-            eval_result = self.evaluator.evaluate_extraction(raw_response, url)
+            # Step 5: Evaluate quality, reusing the parsed response when there is one
+            if response_data is not None:
+                eval_result = self.evaluator.evaluate_data(response_data, url)
+            else:
+                eval_result = self.evaluator.evaluate_extraction(raw_response, url)
             quality_metrics = QualityMetrics(
                 overall_score=eval_result.overall_score,
                 field_scores=eval_result.field_quality_scores,
@@ -267,46 +395,23 @@ class ExperimentRunner:
                                  completed_at: datetime) -> ExperimentSummary:
         """Create summary from experiment results"""
         successful = [r for r in results if r.extraction_successful]
-        failed = [r for r in results if not r.extraction_successful]
+        failed_count = len(results) - len(successful)
         
         # Calculate aggregates
         total_cost = sum(r.cost_usd for r in results)
         total_tokens = sum(r.total_tokens for r in results)
-        avg_execution_time = sum(r.execution_time for r in results) / len(results) if results else 0
+        avg_execution_time = fmean(r.execution_time for r in results) if results else 0
         
         # Quality metrics
         quality_scores = [r.quality_metrics.overall_score for r in successful]
-        avg_quality = sum(quality_scores) / len(quality_scores) if quality_scores else 0
+        avg_quality = fmean(quality_scores) if quality_scores else 0
         
-        # Quality distribution
-        score_distribution = {
-            "0.0-0.2": 0,
-            "0.2-0.4": 0,
-            "0.4-0.6": 0,
-            "0.6-0.8": 0,
-            "0.8-1.0": 0
-        }
-        
-        for score in quality_scores:
-            if score <= 0.2:
-                score_distribution["0.0-0.2"] += 1
-            elif score <= 0.4:
-                score_distribution["0.2-0.4"] += 1
-            elif score <= 0.6:
-                score_distribution["0.4-0.6"] += 1
-            elif score <= 0.8:
-                score_distribution["0.6-0.8"] += 1
-            else:
-                score_distribution["0.8-1.0"] += 1
+        # Quality distribution; bisect_left keeps each bucket's upper edge inclusive
+        bucket_counts = Counter(bisect_left(QUALITY_BUCKET_EDGES, score) for score in quality_scores)
+        score_distribution = {label: bucket_counts[i] for i, label in enumerate(QUALITY_BUCKET_LABELS)}
         
         # Common issues
-        all_issues = []
-        for r in results:
-            all_issues.extend(r.quality_metrics.issues)
-        
-        issue_counts = {}
-        for issue in all_issues:
-            issue_counts[issue] = issue_counts.get(issue, 0) + 1
+        issue_counts = Counter(issue for r in results for issue in r.quality_metrics.issues)
         
         # Performance metrics
         duration_seconds = (completed_at - started_at).total_seconds()
@@ -316,14 +421,14 @@ class ExperimentRunner:
             config=config,
             total_urls=len(results),
             successful_extractions=len(successful),
-            failed_extractions=len(failed),
+            failed_extractions=failed_count,
             total_cost=total_cost,
             total_tokens=total_tokens,
             avg_execution_time=avg_execution_time,
             success_rate=len(successful) / len(results) if results else 0,
             avg_quality_score=avg_quality,
             quality_score_distribution=score_distribution,
-            common_issues=issue_counts,
+            common_issues=dict(issue_counts),
             tokens_per_second=tokens_per_second,
             cost_per_url=total_cost / len(results) if results else 0,
             started_at=started_at,
@@ -339,10 +444,9 @@ class ExperimentRunner:
         
         # Save summary
         summary_file = output_dir / f"{summary.config.experiment_id}_summary.json"
-        with open(summary_file, 'w') as f:
-            # Convert to dict and handle datetime serialization
-            summary_dict = summary.model_dump(mode='json')
-            json.dump(summary_dict, f, indent=2, default=str)
+        with open(summary_file, 'w', encoding='utf-8') as f:
+            # Serialize in one pass with pydantic's native JSON encoder
+            f.write(summary.model_dump_json(indent=2))
         
         # Save detailed results as CSV
         results_data = []
@@ -1,9 +1,11 @@
 """Report generator for benchmarking results with charts and comparisons"""
-import json
+import csv
+import heapq
 from datetime import datetime
+from operator import attrgetter, itemgetter
 from pathlib import Path
 from typing import List, Dict, Any, Optional
-import pandas as pd
+import numpy as np
 
 # Optional matplotlib imports for chart generation
 try:
@@ -23,6 +25,21 @@ except ImportError:
 
 from .models import ExperimentSummary, BenchmarkComparison
 
+# Column order for generate_csv_comparison rows
+CSV_COMPARISON_COLUMNS = (
+    'model', 'url', 'success', 'quality_score', 'json_parseable',
+    'required_fields_present', 'url_valid', 'execution_time', 'prompt_tokens',
+    'completion_tokens', 'total_tokens', 'cost_usd', 'error', 'issues'
+)
+
+# Reads the plain ExperimentResult values between 'model' and 'error' in one call
+CSV_COMPARISON_VALUES = attrgetter(
+    'url', 'extraction_successful', 'quality_metrics.overall_score',
+    'quality_metrics.json_parseable', 'quality_metrics.required_fields_present',
+    'quality_metrics.url_valid', 'execution_time', 'prompt_tokens',
+    'completion_tokens', 'total_tokens', 'cost_usd'
+)
+
 
 class ReportGenerator:
     """Generates comprehensive reports from benchmarking experiments"""
@@ -37,15 +54,18 @@ class ReportGenerator:
         if not summaries:
             return "No experiment summaries provided"
         
+        # One timestamp for the report name and every generated document
+        generated_at = datetime.now()
+        
         # Generate report name if not provided
         if not report_name:
-            report_name = f"benchmark_comparison_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+            report_name = f"benchmark_comparison_{generated_at.strftime('%Y%m%d_%H%M%S')}"
         
         # Create comparison object
         comparison = self._create_benchmark_comparison(summaries)
         
         # Generate markdown report
-        markdown_report = self._generate_markdown_report(comparison, summaries)
+        markdown_report = self._generate_markdown_report(comparison, summaries, generated_at)
         
         # Generate charts if matplotlib is available
         if MATPLOTLIB_AVAILABLE:
@@ -62,12 +82,11 @@ class ReportGenerator:
         
         # Save raw data
         data_path = self.output_dir / f"{report_name}_data.json"
-        with open(data_path, 'w') as f:
-            comparison_dict = comparison.model_dump(mode='json')
-            json.dump(comparison_dict, f, indent=2, default=str)
+        with open(data_path, 'w', encoding='utf-8') as f:
+            f.write(comparison.model_dump_json(indent=2))
         
         # Generate executive summary
-        exec_summary = self._generate_executive_summary(comparison, summaries)
+        exec_summary = self._generate_executive_summary(comparison, summaries, generated_at)
         exec_path = self.output_dir / f"{report_name}_executive_summary.md"
         with open(exec_path, 'w') as f:
             f.write(exec_summary)
@@ -106,29 +125,34 @@ class ReportGenerator:
             speed_comparison[model_name] = summary.avg_execution_time
             
             # Calculate variance in quality scores
-            quality_scores = [r.quality_metrics.overall_score for r in summary.results 
-                            if r.extraction_successful]
-            if quality_scores:
-                variance = pd.Series(quality_scores).var()
+            quality_scores = np.fromiter(
+                (r.quality_metrics.overall_score for r in summary.results if r.extraction_successful),
+                dtype=float
+            )
+            if quality_scores.size:
+                # Sample variance, NaN for a single score as pandas' Series.var gave
+                variance = quality_scores.var(ddof=1) if quality_scores.size > 1 else float('nan')
                 quality_variance[model_name] = variance
         
         # Determine winners
-        best_quality_model = max(quality_comparison.items(), key=lambda x: x[1])[0]
-        best_cost_model = min(cost_comparison.items(), key=lambda x: x[1])[0]
-        best_speed_model = min(speed_comparison.items(), key=lambda x: x[1])[0]
+        best_quality_model = max(quality_comparison, key=quality_comparison.get)
+        best_cost_model = min(cost_comparison, key=cost_comparison.get)
+        best_speed_model = min(speed_comparison, key=speed_comparison.get)
         
         # Recommend model based on balanced criteria
+        max_cost = max(cost_comparison.values())
+        max_speed = max(speed_comparison.values())
         scores = {}
         for model in summaries.keys():
             # Normalize scores (0-1 range)
             quality_score = quality_comparison[model]
-            cost_score = 1 - (cost_comparison[model] / max(cost_comparison.values()))
-            speed_score = 1 - (speed_comparison[model] / max(speed_comparison.values()))
+            cost_score = 1 - (cost_comparison[model] / max_cost)
+            speed_score = 1 - (speed_comparison[model] / max_speed)
             
             # Weighted average (quality is most important)
             scores[model] = (quality_score * 0.5) + (cost_score * 0.3) + (speed_score * 0.2)
         
-        recommended_model = max(scores.items(), key=lambda x: x[1])[0]
+        recommended_model = max(scores, key=scores.get)
         
         # Generate recommendation reason
         if recommended_model == best_quality_model:
@@ -164,10 +188,12 @@ class ReportGenerator:
         )
     
     def _generate_markdown_report(self, comparison: BenchmarkComparison, 
-                                summaries: Dict[str, ExperimentSummary]) -> str:
+                                summaries: Dict[str, ExperimentSummary],
+                                generated_at: Optional[datetime] = None) -> str:
         """Generate detailed markdown report"""
+        generated_at = generated_at or datetime.now()
         report = ["# LLM Model Benchmarking Report", ""]
-        report.append(f"Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+        report.append(f"Generated: {generated_at.strftime('%Y-%m-%d %H:%M:%S')}")
         report.append("")
         
         # Executive Summary
@@ -226,8 +252,7 @@ class ReportGenerator:
         for model, summary in summaries.items():
             if summary.common_issues:
                 report.append(f"### {model}")
-                top_issues = sorted(summary.common_issues.items(), 
-                                  key=lambda x: x[1], reverse=True)[:5]
+                top_issues = heapq.nlargest(5, summary.common_issues.items(), key=itemgetter(1))
                 for issue, count in top_issues:
                     report.append(f"- {issue}: {count} occurrences")
                 report.append("")
@@ -287,10 +312,12 @@ class ReportGenerator:
         return "\n".join(report)
     
     def _generate_executive_summary(self, comparison: BenchmarkComparison,
-                                  summaries: Dict[str, ExperimentSummary]) -> str:
+                                  summaries: Dict[str, ExperimentSummary],
+                                  generated_at: Optional[datetime] = None) -> str:
         """Generate a concise executive summary"""
+        generated_at = generated_at or datetime.now()
         summary = ["# Executive Summary - LLM Model Benchmarking", ""]
-        summary.append(f"Date: {datetime.now().strftime('%Y-%m-%d')}")
+        summary.append(f"Date: {generated_at.strftime('%Y-%m-%d')}")
         summary.append("")
         
         summary.append("## Key Findings")
@@ -505,11 +532,12 @@ class ReportGenerator:
             
             # 4. Common issues pie chart
             if summary.common_issues:
-                issues = list(summary.common_issues.keys())[:5]  # Top 5
-                counts = [summary.common_issues[i] for i in issues]
+                top_issues = heapq.nlargest(5, summary.common_issues.items(), key=itemgetter(1))
+                counts = [count for _, count in top_issues]
                 
                 # Truncate long issue descriptions
-                issues_short = [i[:30] + '...' if len(i) > 30 else i for i in issues]
+                issues_short = [issue if len(issue) <= 30 else issue[:30] + '...'
+                                for issue, _ in top_issues]
                 
                 ax4.pie(counts, labels=issues_short, autopct='%1.1f%%', startangle=90)
                 ax4.set_title('Top Issues')
@@ -530,29 +558,18 @@ class ReportGenerator:
         if not output_path:
             output_path = self.output_dir / f"comparison_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
         
-        # Collect all results
-        all_results = []
-        for model, summary in summaries.items():
-            for result in summary.results:
-                all_results.append({
-                    'model': model,
-                    'url': result.url,
-                    'success': result.extraction_successful,
-                    'quality_score': result.quality_metrics.overall_score,
-                    'json_parseable': result.quality_metrics.json_parseable,
-                    'required_fields_present': result.quality_metrics.required_fields_present,
-                    'url_valid': result.quality_metrics.url_valid,
-                    'execution_time': result.execution_time,
-                    'prompt_tokens': result.prompt_tokens,
-                    'completion_tokens': result.completion_tokens,
-                    'total_tokens': result.total_tokens,
-                    'cost_usd': result.cost_usd,
-                    'error': result.error_message or '',
-                    'issues': '; '.join(result.quality_metrics.issues)
-                })
-        
-        # Create DataFrame and save
-        df = pd.DataFrame(all_results)
-        df.to_csv(output_path, index=False)
+        # Stream positional rows matching CSV_COMPARISON_COLUMNS straight to disk
+        with open(output_path, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.writer(f)
+            writer.writerow(CSV_COMPARISON_COLUMNS)
+            
+            for model, summary in summaries.items():
+                for result in summary.results:
+                    writer.writerow((
+                        model,
+                        *CSV_COMPARISON_VALUES(result),
+                        result.error_message or '',
+                        '; '.join(result.quality_metrics.issues)
+                    ))
         
         return str(output_path)
\ No newline at end of file
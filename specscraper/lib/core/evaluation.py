@@ -2,13 +2,82 @@ import json
 import re
 import requests
 from urllib.parse import urlparse
-from typing import Dict, List, Tuple, Any
-from dataclasses import dataclass
-from collections import defaultdict
+from typing import Dict, List, Tuple, Any, Optional
+from dataclasses import dataclass, replace
+from collections import Counter, defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from operator import attrgetter
+from statistics import fmean
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+# orjson.JSONDecodeError subclasses json.JSONDecodeError, so callers catch either
+_json_loads = orjson.loads if ORJSON_AVAILABLE else json.loads
+
+IMAGE_EXTENSIONS = ('.jpg', '.png', '.jpeg', '.webp', '.gif')
+
+# Product categories, matched as substrings of the lowercased type
+COMMON_PRODUCT_TYPES = (
+    'furniture', 'electronics', 'clothing', 'kitchen', 'outdoor',
+    'fireplace', 'appliance', 'tool', 'decoration', 'lighting'
+)
+# One case-insensitive scan for any category, without lowercasing a copy first
+PRODUCT_TYPE_PATTERN = re.compile('|'.join(map(re.escape, COMMON_PRODUCT_TYPES)), re.IGNORECASE)
+
+# Quantity values that honestly admit the amount is unknown
+UNKNOWN_QTY_WORDS = ('unspecified', 'unknown', 'n/a')
+
+MODEL_NO_PATTERN = re.compile(r'[A-Z]{2,}[-\s]?\d+')
+
+# Plain http(s) URLs whose host is printable ASCII, which urlparse accepts as-is;
+# anything else (brackets, whitespace, non-ASCII hosts that urlparse checks for
+# delimiters after NFKC normalization, other schemes) takes the full parse
+SIMPLE_URL_PATTERN = re.compile(r'https?://(?:(?![/?#\[\]])[!-~])+(?:[/?#]|\Z)')
+DIGITS_PATTERN = re.compile(r'\d+')
+
+# Batch results scoring below this are reported as low quality
+LOW_QUALITY_THRESHOLD = 0.6
+
+# Weights for the overall extraction score
+FIELD_WEIGHTS = {
+    "image_url": 0.2,
+    "product_link": 0.2,
+    "type": 0.15,
+    "description": 0.25,
+    "model_no": 0.05,
+    "qty": 0.05,
+    "consistency": 0.1
+}
+
+# Below this many extractions, process start-up and pickling outweigh parallel scoring
+PARALLEL_EVAL_MIN_BATCH = 200
+
+# Fields an extraction's score depends on; repeats with the same values share one result
+SCORED_FIELDS = ("image_url", "product_link", "type", "description", "model_no", "qty")
+
+# Scored field combinations remembered per evaluator
+EVAL_CACHE_SIZE = 4096
+
+# Stands in for a field absent from the extraction in cache keys
+_MISSING = object()
+
+# Pass/fail checks tallied per batch, read from a result in one call
+CHECK_FLAGS = attrgetter("json_parseable", "required_fields_present", "url_valid")
 
 @dataclass
 class EvalResult:
     """Stores evaluation results for a single extraction"""
+    # One per scored extraction, so skip the per-instance __dict__
+    __slots__ = (
+        "url_valid", "json_parseable", "required_fields_present",
+        "field_quality_scores", "overall_score", "issues"
+    )
+
     url_valid: bool
     json_parseable: bool
     required_fields_present: bool
@@ -22,6 +91,17 @@ class ProductExtractionEvaluator:
     def __init__(self):
         self.required_fields = ["image_url", "type", "description", "product_link"]
         self.optional_fields = ["model_no", "qty", "key"]
+        self._evaluate_cached = lru_cache(maxsize=EVAL_CACHE_SIZE)(self._evaluate_key)
+
+    def __getstate__(self):
+        # The memo can't be pickled, so worker processes start with their own
+        state = self.__dict__.copy()
+        del state["_evaluate_cached"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._evaluate_cached = lru_cache(maxsize=EVAL_CACHE_SIZE)(self._evaluate_key)
 
     def evaluate_extraction(self, json_str: str, source_url: str = None) -> EvalResult:
         """
@@ -34,13 +114,9 @@ class ProductExtractionEvaluator:
         Returns:
             EvalResult with detailed scoring
         """
-        issues = []
-        field_scores = {}
-
         # 1. JSON Parseability Test
         try:
-            data = json.loads(json_str)
-            json_parseable = True
+            data = _json_loads(json_str)
         except json.JSONDecodeError as e:
             return EvalResult(
                 url_valid=False,
@@ -51,6 +127,35 @@ class ProductExtractionEvaluator:
                 issues=[f"JSON parsing failed: {e}"]
             )
 
+        return self.evaluate_data(data, source_url)
+
+    def evaluate_data(self, data: Dict[str, Any], source_url: str = None) -> EvalResult:
+        """Evaluate an extraction whose JSON the caller has already parsed"""
+        if not isinstance(data, dict):
+            return self._evaluate_data_uncached(data, source_url)
+
+        values = tuple(data.get(field, _MISSING) for field in SCORED_FIELDS)
+        # Only string/null fields are memoized; numbers or lists could compare equal
+        # across types that score differently, or not be hashable at all
+        if not all(type(value) is str or value is None or value is _MISSING for value in values):
+            return self._evaluate_data_uncached(data, source_url)
+
+        result = self._evaluate_cached((source_url,) + values)
+
+        # Callers get their own containers so the memoized result stays intact
+        return replace(result, field_quality_scores=dict(result.field_quality_scores),
+                       issues=list(result.issues))
+
+    def _evaluate_key(self, key: Tuple[Any, ...]) -> EvalResult:
+        """Evaluate the extraction described by a cache key"""
+        data = {field: value for field, value in zip(SCORED_FIELDS, key[1:]) if value is not _MISSING}
+        return self._evaluate_data_uncached(data, key[0])
+
+    def _evaluate_data_uncached(self, data: Dict[str, Any], source_url: str = None) -> EvalResult:
+        """Score a parsed extraction field by field"""
+        issues = []
+        field_scores = {}
+
         # 2. Required Fields Test
         missing_fields = [f for f in self.required_fields if f not in data]
         required_fields_present = len(missing_fields) == 0
@@ -58,18 +163,20 @@ class ProductExtractionEvaluator:
             issues.append(f"Missing required fields: {missing_fields}")
 
         # 3. Field Quality Evaluation
-        field_scores["image_url"] = self._evaluate_url(data.get("image_url", ""))
-        field_scores["product_link"] = self._evaluate_url(data.get("product_link", ""))
+        # Each URL is parsed once; its validity feeds both the score and step 4
+        image_url = data.get("image_url", "")
+        product_link = data.get("product_link", "")
+        image_url_valid = self._is_valid_url(image_url)
+        product_link_valid = self._is_valid_url(product_link)
+        field_scores["image_url"] = self._evaluate_url(image_url, image_url_valid)
+        field_scores["product_link"] = self._evaluate_url(product_link, product_link_valid)
         field_scores["type"] = self._evaluate_type_field(data.get("type", ""))
         field_scores["description"] = self._evaluate_description(data.get("description", ""))
         field_scores["model_no"] = self._evaluate_model_no(data.get("model_no", ""))
         field_scores["qty"] = self._evaluate_quantity(data.get("qty", ""))
 
         # 4. URL Validation
-        urls_valid = all([
-            self._is_valid_url(data.get("image_url", "")),
-            self._is_valid_url(data.get("product_link", ""))
-        ])
+        urls_valid = image_url_valid and product_link_valid
 
         # 5. Content Consistency Checks
         consistency_score = self._check_consistency(data, source_url)
@@ -80,31 +187,36 @@ class ProductExtractionEvaluator:
 
         return EvalResult(
             url_valid=urls_valid,
-            json_parseable=json_parseable,
+            json_parseable=True,
             required_fields_present=required_fields_present,
             field_quality_scores=field_scores,
             overall_score=overall_score,
             issues=issues
         )
 
-    def _evaluate_url(self, url: str) -> float:
-        """Score URL quality (0-1)"""
+    def _evaluate_url(self, url: str, is_valid: Optional[bool] = None) -> float:
+        """Score URL quality (0-1), reusing a precomputed validity check if given"""
         if not url or url.strip() == "":
             return 0.0
 
-        if not self._is_valid_url(url):
+        if is_valid is None:
+            is_valid = self._is_valid_url(url)
+        if not is_valid:
             return 0.2
 
         # Check if it's a reasonable image/product URL
-        if any(ext in url.lower() for ext in ['.jpg', '.png', '.jpeg', '.webp', '.gif']):
+        url_lower = url.lower()
+        if any(ext in url_lower for ext in IMAGE_EXTENSIONS):
             return 1.0
-        elif 'image' in url.lower() or 'photo' in url.lower() or 'product' in url.lower():
+        elif 'image' in url_lower or 'photo' in url_lower or 'product' in url_lower:
             return 0.8
         else:
             return 0.6
 
     def _is_valid_url(self, url: str) -> bool:
         """Check if URL is properly formatted"""
+        if isinstance(url, str) and SIMPLE_URL_PATTERN.match(url):
+            return True
         try:
             result = urlparse(url)
             return all([result.scheme, result.netloc])
@@ -113,19 +225,14 @@ class ProductExtractionEvaluator:
 
     def _evaluate_type_field(self, type_val: str) -> float:
         """Score product type quality"""
-        if not type_val or type_val.strip() == "":
+        type_stripped = type_val.strip() if type_val else ""
+        if not type_stripped:
             return 0.0
 
         # Check for reasonable product categories
-        common_types = [
-            'furniture', 'electronics', 'clothing', 'kitchen', 'outdoor',
-            'fireplace', 'appliance', 'tool', 'decoration', 'lighting'
-        ]
-
-        type_lower = type_val.lower()
-        if any(cat in type_lower for cat in common_types):
+        if PRODUCT_TYPE_PATTERN.search(type_val):
             return 1.0
-        elif len(type_val.strip()) > 2:
+        elif len(type_stripped) > 2:
             return 0.7
         else:
             return 0.3
@@ -149,26 +256,28 @@ class ProductExtractionEvaluator:
 
     def _evaluate_model_no(self, model: str) -> float:
         """Score model number field"""
-        if not model or model.strip() == "":
+        model_stripped = model.strip() if model else ""
+        if not model_stripped:
             return 0.5  # Neutral - not always available
 
         # Look for typical model patterns
-        if re.search(r'[A-Z]{2,}[-\s]?\d+', model):
+        if MODEL_NO_PATTERN.search(model):
             return 1.0
-        elif len(model.strip()) > 2:
+        elif len(model_stripped) > 2:
             return 0.7
         else:
             return 0.3
 
     def _evaluate_quantity(self, qty: str) -> float:
         """Score quantity field"""
-        if not qty or qty.strip() == "":
+        qty_stripped = qty.strip() if qty else ""
+        if not qty_stripped:
             return 0.5
 
-        qty_lower = qty.lower().strip()
-        if any(word in qty_lower for word in ['unspecified', 'unknown', 'n/a']):
+        qty_lower = qty_stripped.lower()
+        if any(word in qty_lower for word in UNKNOWN_QTY_WORDS):
             return 0.8  # Honest about not knowing
-        elif re.search(r'\d+', qty):
+        elif DIGITS_PATTERN.search(qty):
             return 1.0
         else:
             return 0.6
@@ -177,23 +286,20 @@ class ProductExtractionEvaluator:
         """Check internal consistency of extracted data"""
         score = 1.0
 
-        # Check if product_link and image_url are from same domain
+        product_link = data.get("product_link")
+        image_url = data.get("image_url")
+        if not (product_link and image_url):
+            return score
+
+        # Shared-domain bonuses would land on a score already at the 1.0 cap, so
+        # skip the domain comparison; only a link that fails to parse costs points
         try:
-            if data.get("product_link") and data.get("image_url"):
-                prod_domain = urlparse(data["product_link"]).netloc
-                img_domain = urlparse(data["image_url"]).netloc
-
-                if prod_domain and img_domain:
-                    # Same domain is good
-                    if prod_domain == img_domain:
-                        score += 0.1
-                    # Different but reasonable domains
-                    elif any(common in prod_domain for common in img_domain.split('.')):
-                        score += 0.05
+            urlparse(product_link)
+            urlparse(image_url)
         except Exception:
             score -= 0.1
 
-        return min(score, 1.0)
+        return score
 
     def _calculate_overall_score(self, field_scores: Dict[str, float],
                                required_present: bool, urls_valid: bool) -> float:
@@ -202,18 +308,8 @@ class ProductExtractionEvaluator:
             return 0.2
 
         # Weighted scoring
-        weights = {
-            "image_url": 0.2,
-            "product_link": 0.2,
-            "type": 0.15,
-            "description": 0.25,
-            "model_no": 0.05,
-            "qty": 0.05,
-            "consistency": 0.1
-        }
-
         weighted_score = sum(field_scores.get(field, 0) * weight
-                           for field, weight in weights.items())
+                           for field, weight in FIELD_WEIGHTS.items())
 
         # Penalty for invalid URLs
         if not urls_valid:
@@ -221,45 +317,57 @@ class ProductExtractionEvaluator:
 
         return round(weighted_score, 3)
 
-    def evaluate_batch(self, extractions: List[Tuple[str, str]]) -> Dict[str, Any]:
+    def evaluate_batch(self, extractions: List[Tuple[str, str]],
+                       max_workers: Optional[int] = None) -> Dict[str, Any]:
         """
         Evaluate multiple extractions and return summary statistics
 
         Args:
             extractions: List of (json_string, source_url) tuples
+            max_workers: Score across this many worker processes for batches of
+                at least PARALLEL_EVAL_MIN_BATCH; scores in the calling process when unset
 
         Returns:
             Dictionary with batch evaluation results
         """
-        results = []
-        for json_str, source_url in extractions:
-            result = self.evaluate_extraction(json_str, source_url)
-            results.append(result)
+        if max_workers and max_workers > 1 and len(extractions) >= PARALLEL_EVAL_MIN_BATCH:
+            # Scoring is pure-Python CPU work, so spread it over processes in chunks
+            json_strs, source_urls = zip(*extractions)
+            chunksize = max(1, len(extractions) // (max_workers * 4))
+            with ProcessPoolExecutor(max_workers=max_workers) as executor:
+                results = list(executor.map(self.evaluate_extraction, json_strs, source_urls,
+                                            chunksize=chunksize))
+        else:
+            results = [self.evaluate_extraction(json_str, source_url)
+                       for json_str, source_url in extractions]
 
         # Calculate batch statistics
-        scores = [r.overall_score for r in results]
+        scores = [result.overall_score for result in results]
         field_scores = defaultdict(list)
 
         for result in results:
             for field, score in result.field_quality_scores.items():
                 field_scores[field].append(score)
 
+        # Column-wise sums of the check flags in one pass
+        json_ok, fields_ok, url_ok = (
+            map(sum, zip(*map(CHECK_FLAGS, results))) if results else (0, 0, 0)
+        )
+
         # Aggregate statistics
         batch_stats = {
             "total_extractions": len(results),
-            "avg_score": sum(scores) / len(scores) if scores else 0,
+            "avg_score": fmean(scores) if scores else 0,
             "min_score": min(scores) if scores else 0,
             "max_score": max(scores) if scores else 0,
-            "json_parse_success_rate": sum(1 for r in results if r.json_parseable) / len(results),
-            "required_fields_success_rate": sum(1 for r in results if r.required_fields_present) / len(results),
-            "url_validity_rate": sum(1 for r in results if r.url_valid) / len(results),
+            "json_parse_success_rate": json_ok / len(results),
+            "required_fields_success_rate": fields_ok / len(results),
+            "url_validity_rate": url_ok / len(results),
             "field_avg_scores": {
                 field: sum(scores) / len(scores) if scores else 0
                 for field, scores in field_scores.items()
             },
-            "low_quality_extractions": [
-                i for i, result in enumerate(results) if result.overall_score < 0.6
-            ],
+            "low_quality_extractions": [i for i, score in enumerate(scores) if score < LOW_QUALITY_THRESHOLD],
             "common_issues": self._get_common_issues(results)
         }
 
@@ -285,8 +393,5 @@ class ProductExtractionEvaluator:
 
     def _get_common_issues(self, results: List[EvalResult]) -> Dict[str, int]:
         """Find most common issues across extractions"""
-        issue_counts = defaultdict(int)
-        for result in results:
-            for issue in result.issues:
-                issue_counts[issue] += 1
-        return dict(sorted(issue_counts.items(), key=lambda x: x[1], reverse=True))
+        issue_counts = Counter(issue for result in results for issue in result.issues)
+        return dict(issue_counts.most_common())
@@ -1,7 +1,17 @@
+import time
+from concurrent.futures import ProcessPoolExecutor
 from pydantic import BaseModel
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Tuple
 from bs4 import BeautifulSoup
 
+# Tags stripped before text extraction
+REMOVE_TAGS = [
+    "script", "style", "noscript", "svg", "footer", "header",
+    "nav", "form", "iframe", "aside", "canvas", "button", "input", "select", "option"
+]
+
+GARBAGE_KEYWORDS = ["cookie", "newsletter", "subscribe", "banner", "social", "share", "advert"]
+
 
 class ImgTag(BaseModel):
     """Pydantic model for image tag"""
@@ -32,16 +42,6 @@ class HTMLProcessor:
         """
         soup = BeautifulSoup(raw_html, "html.parser")
 
-        REMOVE_TAGS = [
-            "script", "style", "noscript", "svg", "footer", "header",
-            "nav", "form", "iframe", "aside", "canvas", "button", "input", "select", "option"
-        ]
-
-        GARBAGE_KEYWORDS = ["cookie", "newsletter", "subscribe", "banner", "social", "share", "advert"]
-
-        preprocessed_html = {}
-
-
         # Remove noise tags
         for tag in soup(REMOVE_TAGS):
             tag.decompose()
@@ -84,6 +84,40 @@ class HTMLProcessor:
             images=images
         )
 
+    @staticmethod
+    def clean_html_json_timed(raw_html: str) -> Tuple[str, float]:
+        """Clean one HTML document, returning its JSON and parse time; picklable for worker pools"""
+        start_time = time.time()
+        cleaned_html_json = HTMLProcessor.clean_html(raw_html).model_dump_json()
+        return cleaned_html_json, time.time() - start_time
+
+    @staticmethod
+    def clean_html_batch(raw_htmls: List[str], max_workers: Optional[int] = None) -> List[ProcessedHTML]:
+        """
+        Process several raw HTML strings in one call
+        
+        Args:
+            raw_htmls (List[str]): Raw HTML documents to process
+            max_workers (int, optional): Parse across this many worker processes;
+                parses in the calling process when unset
+            
+        Returns:
+            List[ProcessedHTML]: Processed content in the same order as the input;
+                identical documents share one parsed result
+        """
+        clean_html = HTMLProcessor.clean_html
+        # Rows often repeat the same page, so parse each distinct document once
+        distinct_htmls = list(dict.fromkeys(raw_htmls))
+        if max_workers and max_workers > 1 and len(distinct_htmls) > 1:
+            # Parsing is CPU-bound and holds the GIL, so spread it over processes
+            chunksize = max(1, len(distinct_htmls) // (max_workers * 4))
+            with ProcessPoolExecutor(max_workers=max_workers) as executor:
+                parsed = list(executor.map(clean_html, distinct_htmls, chunksize=chunksize))
+        else:
+            parsed = [clean_html(raw_html) for raw_html in distinct_htmls]
+        processed = dict(zip(distinct_htmls, parsed))
+        return [processed[raw_html] for raw_html in raw_htmls]
+
 if __name__ == '__main__':
     test_html = """
     <!DOCTYPE html>
@@ -1,4 +1,5 @@
 """LLM integration module with invocation and prompt templating"""
+from functools import lru_cache
 from typing import Optional, Dict, Any
 from openai import OpenAI
 from dotenv import load_dotenv
@@ -7,6 +8,9 @@ import logging
 from pydantic import BaseModel, Field
 from lib.utils.openai_rate_limiter import OpenAIRateLimiter
 
+# Load environment variables
+load_dotenv()
+
 # Create standard logger - no configuration
 logger = logging.getLogger(__name__)
 
@@ -219,16 +223,21 @@ class PromptTemplator:
         """
 
 
+@lru_cache(maxsize=4)
+def _get_openai_client(api_key: str) -> OpenAI:
+    """Return a process-wide OpenAI client so its connection pool is shared"""
+    return OpenAI(api_key=api_key)
+
+
 class LLMInvocator:
     """Service for invoking LLM models with rate limiting"""
 
     def __init__(self):
-        load_dotenv()
-
-        if os.getenv("OPENAI_API_KEY") is None:
+        api_key = os.getenv("OPENAI_API_KEY")
+        if api_key is None:
             raise ValueError("OPENAI_API_KEY is not set")
         
-        self.client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+        self.client = _get_openai_client(api_key)
         self.rate_limiter = OpenAIRateLimiter()
         
         logger.info("Initialized LLMInvocator with rate limiting")
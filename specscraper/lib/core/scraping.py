@@ -13,6 +13,7 @@ from pydantic import BaseModel, Field
 from datetime import datetime
 from enum import Enum
 import threading
+from functools import lru_cache
 
 # Load environment variables
 load_dotenv()
@@ -20,6 +21,118 @@ load_dotenv()
 # Create standard logger - no configuration
 logger = logging.getLogger(__name__)
 
+# Connections kept open to the Firecrawl API; matches the pipeline's scrape workers
+FIRECRAWL_POOL_SIZE = 10
+
+# Firecrawl requests allowed in any 60 second window
+FIRECRAWL_RATE_LIMIT = 10
+
+# Hosts whose keep-alive connections the page session retains; specbooks revisit
+# the same vendor sites across many products, well past requests' default of 10
+SCRAPE_HOST_POOLS = 50
+
+# Page content markers; matched as substrings of the lowercased HTML
+BOT_INDICATORS = (
+    "pardon our interruption",
+    "you were browsing something about your browser made us think you were a bot",
+    # "please make sure that cookies and javascript are enabled",
+    # "why have i been blocked",
+    # "enable javascript and cookies",
+    # "browser check",
+    # "ddos protection",
+    # # Add Incapsula detection
+    # "incapsula",
+    # "incident_id",
+    # "request unsuccessful",
+    # "main-iframe",
+    # "_incapsula_resource",
+    # "swudnsai",
+    # "xinfo"
+)
+
+CAPTCHA_INDICATORS = {
+    'recaptcha': (
+        'recaptcha',
+        'g-recaptcha',
+        'grecaptcha',
+        'google.com/recaptcha',
+        'recaptcha-checkbox',
+        'recaptcha-anchor',
+        'i\'m not a robot'
+    ),
+    'hcaptcha': (
+        'hcaptcha',
+        'h-captcha',
+        'hcaptcha.com',
+        'hcaptcha-checkbox'
+    ),
+    'cloudflare': (
+        'cf-challenge',
+        'cloudflare',
+        'cf-ray',
+        'checking your browser',
+        'cloudflare-static',
+        'cf-browser-verification',
+        'please wait while we check your browser',
+        'ddos protection by cloudflare'
+    ),
+    'incapsula': (
+        'incapsula',
+        'incident_id',
+        'request unsuccessful',
+        'main-iframe',
+        '_incapsula_resource',
+        'swudnsai',
+        'xinfo'
+    ),
+    'funcaptcha': (
+        'funcaptcha',
+        'arkoselabs',
+        'arkose',
+        'fun-captcha'
+    ),
+    'other': (
+        'captcha',
+        'security check',
+        'verify you are human',
+        'prove you are not a robot',
+        'complete the challenge',
+        'solve the puzzle',
+        'anti-bot verification'
+    )
+}
+
+def _captcha_scans(indicators: Tuple[str, ...]) -> Tuple[Tuple[str, Optional[str]], ...]:
+    """Pair each CAPTCHA marker with an earlier marker of its type that it contains"""
+    return tuple(
+        (marker, next((earlier for earlier in indicators[:i] if earlier in marker), None))
+        for i, marker in enumerate(indicators)
+    )
+
+
+# A marker containing an earlier marker of its type can only be present when that
+# one was found, e.g. 'g-recaptcha' needs 'recaptcha', so clean pages skip its scan
+CAPTCHA_SCANS = {
+    captcha_type: _captcha_scans(indicators) for captcha_type, indicators in CAPTCHA_INDICATORS.items()
+}
+
+ERROR_PAGE_INDICATORS = (
+    '404 not found',
+    '403 forbidden',
+    '500 internal server error',
+    'page not found',
+    'access forbidden',
+    'server error'
+)
+
+TIMEOUT_PAGE_INDICATORS = (
+    'timeout',
+    'took too long to respond',
+    'connection timed out',
+    'request timeout'
+)
+
+
 class ScrapingMethod(str, Enum):
     """Enumeration of available scraping methods"""
     REQUESTS = "requests"
@@ -27,6 +140,9 @@ class ScrapingMethod(str, Enum):
     AUTO = "auto"
     CACHED = "cached"
 
+# Methods scrape_url accepts, keyed by value so plain strings resolve to members
+SCRAPE_URL_METHODS = {m.value: m for m in (ScrapingMethod.REQUESTS, ScrapingMethod.FIRECRAWL, ScrapingMethod.AUTO)}
+
 class PageIssue(str, Enum):
     """Enumeration of possible page issues"""
     BOT_DETECTED = "bot_detected"
@@ -137,10 +253,19 @@ class StealthConfig:
 class FirecrawlApiClient:
     """Direct API client for Firecrawl service - replaces SDK to eliminate stdout pollution"""
 
-    def __init__(self, api_key: str):
+    def __init__(self, api_key: str, pool_size: int = FIRECRAWL_POOL_SIZE):
         self.api_key = api_key
         self.base_url = "https://api.firecrawl.dev/v1"
 
+        # Persistent session so scrapes reuse TCP/TLS connections to the API
+        self.session = requests.Session()
+        adapter = requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount("https://", adapter)
+        self.session.headers.update({
+            'Authorization': f'Bearer {self.api_key}',
+            'Content-Type': 'application/json'
+        })
+
     def scrape_url(self, url: str, formats: List[str] = None, only_main_content: bool = False,
                    timeout: int = 60000, parse_pdf: bool = False, max_age: int = 14400000):
         """
@@ -160,15 +285,9 @@ class FirecrawlApiClient:
             'maxAge': max_age
         }
 
-        headers = {
-            'Authorization': f'Bearer {self.api_key}',
-            'Content-Type': 'application/json'
-        }
-
         try:
-            response = requests.post(
+            response = self.session.post(
                 f"{self.base_url}/scrape",
-                headers=headers,
                 json=payload,
                 timeout=timeout/1000  # Convert ms to seconds for requests timeout
             )
@@ -180,6 +299,12 @@ class FirecrawlApiClient:
             return FirecrawlResponse(None, error=str(e))
 
 
+@lru_cache(maxsize=4)
+def _get_firecrawl_client(api_key: str) -> FirecrawlApiClient:
+    """Return a process-wide Firecrawl client so its connection pool is shared"""
+    return FirecrawlApiClient(api_key=api_key)
+
+
 class FirecrawlResponse:
     """Response wrapper to match FirecrawlApp SDK interface"""
 
@@ -215,12 +340,15 @@ class StealthScraper:
         # Concurrency control
         self._semaphore = threading.Semaphore(2)
         
-        # Rate limiting - single lock for atomic operations
+        # Rate limiting - token bucket shared by all worker threads
         self._rate_lock = threading.Lock()
-        self._request_count = 0
-        self._window_start = time.time()
+        self._rate_tokens = 1.0
+        self._rate_refilled_at = time.monotonic()
 
         self.session = requests.Session()
+        adapter = requests.adapters.HTTPAdapter(pool_connections=SCRAPE_HOST_POOLS)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
 
         # Get Firecrawl API key from environment variable
         self.firecrawl_api_key = os.getenv('FIRECRAWL_API_KEY')
@@ -228,7 +356,7 @@ class StealthScraper:
         if not self.firecrawl_api_key:
             self.logger.warning("FIRECRAWL_API_KEY not found in environment variables")
         else:
-            self.firecrawl = FirecrawlApiClient(api_key=self.firecrawl_api_key)
+            self.firecrawl = _get_firecrawl_client(self.firecrawl_api_key)
         
         # Initialize stealth configuration
         self.stealth_config = StealthConfig()
@@ -238,26 +366,25 @@ class StealthScraper:
         self.setup_session()
 
     def _acquire_rate_limit(self):
-        """Handle rate limiting logic"""
+        """Take a token from the rate-limit bucket, waiting until one is available"""
+        refill_per_second = FIRECRAWL_RATE_LIMIT / 60
         with self._rate_lock:
-            current_time = time.time()
-            
-            # Reset window if 60 seconds have passed
-            if current_time - self._window_start >= 60:
-                self._window_start = current_time
-                self._request_count = 0
-            
-            # If we've hit the limit, wait
-            if self._request_count >= 10:
-                wait_time = 60 - (current_time - self._window_start)
-                if wait_time > 0:
-                    time.sleep(wait_time)
-                # Reset after waiting
-                self._window_start = time.time()
-                self._request_count = 0
+            current_time = time.monotonic()
+            # The bucket holds a single token, spacing requests 60 / limit seconds
+            # apart; a larger burst on top of the refill would exceed the limit
+            self._rate_tokens = min(
+                1.0,
+                self._rate_tokens + (current_time - self._rate_refilled_at) * refill_per_second
+            )
+            self._rate_refilled_at = current_time
             
-            # Increment count
-            self._request_count += 1
+            # Reserve the token now; a negative balance queues callers in order
+            self._rate_tokens -= 1
+            wait_time = -self._rate_tokens / refill_per_second if self._rate_tokens < 0 else 0
+        
+        # Sleep outside the lock so other workers can take their reservations
+        if wait_time > 0:
+            time.sleep(wait_time)
         
     def setup_session(self):
         """Configure requests session with realistic headers"""
@@ -287,20 +414,20 @@ class StealthScraper:
         Returns:
             ScrapeResult: Standardized result object containing success status, content, and metadata
         """
-        # Validate method
-        valid_methods = ["requests", "firecrawl", "auto"]
-        if method not in valid_methods:
-            raise ValueError(f"Invalid method '{method}'. Valid methods are: {', '.join(valid_methods)}")
+        # Resolve the method to its enum member once; branches compare by identity
+        scrape_method = SCRAPE_URL_METHODS.get(method)
+        if scrape_method is None:
+            raise ValueError(f"Invalid method '{method}'. Valid methods are: {', '.join(SCRAPE_URL_METHODS)}")
             
         start_time = time.time()
         all_methods_tried = set()
         all_page_issues = []
         total_attempts = 0
 
-        if method == "firecrawl":
+        if scrape_method is ScrapingMethod.FIRECRAWL:
             return self.scrape_with_firecrawl(url)
 
-        if method == "requests":
+        if scrape_method is ScrapingMethod.REQUESTS:
             return self.scrape_with_requests(url, **kwargs)
 
         else:  # auto - try methods in sequence
@@ -484,26 +611,11 @@ class StealthScraper:
     
     def is_bot_detected(self, html_content):
         """Check if the response indicates bot detection"""
-        bot_indicators = [
-            "pardon our interruption",
-            "you were browsing something about your browser made us think you were a bot",
-            # "please make sure that cookies and javascript are enabled",
-            # "why have i been blocked",
-            # "enable javascript and cookies",
-            # "browser check",
-            # "ddos protection",
-            # # Add Incapsula detection
-            # "incapsula",
-            # "incident_id",
-            # "request unsuccessful",
-            # "main-iframe",
-            # "_incapsula_resource",
-            # "swudnsai",
-            # "xinfo"
-        ]
-        
-        content_lower = html_content.lower()
-        return any(indicator in content_lower for indicator in bot_indicators)
+        return self._has_bot_indicator(html_content.lower())
+    
+    def _has_bot_indicator(self, content_lower: str) -> bool:
+        """Check already-lowercased content for bot detection markers"""
+        return any(indicator in content_lower for indicator in BOT_INDICATORS)
     
     def is_captcha_present(self, html_content):
         """
@@ -516,70 +628,21 @@ class StealthScraper:
                 'indicators': list  # List of found indicators
             }
         """
-        captcha_indicators = {
-            'recaptcha': [
-                'recaptcha',
-                'g-recaptcha',
-                'grecaptcha',
-                'google.com/recaptcha',
-                'recaptcha-checkbox',
-                'recaptcha-anchor',
-                'i\'m not a robot'
-            ],
-            'hcaptcha': [
-                'hcaptcha',
-                'h-captcha',
-                'hcaptcha.com',
-                'hcaptcha-checkbox'
-            ],
-            'cloudflare': [
-                'cf-challenge',
-                'cloudflare',
-                'cf-ray',
-                'checking your browser',
-                'cloudflare-static',
-                'cf-browser-verification',
-                'please wait while we check your browser',
-                'ddos protection by cloudflare'
-            ],
-            'incapsula': [
-                'incapsula',
-                'incident_id',
-                'request unsuccessful',
-                'main-iframe',
-                '_incapsula_resource',
-                'swudnsai',
-                'xinfo'
-            ],
-            'funcaptcha': [
-                'funcaptcha',
-                'arkoselabs',
-                'arkose',
-                'fun-captcha'
-            ],
-            'other': [
-                'captcha',
-                'security check',
-                'verify you are human',
-                'prove you are not a robot',
-                'complete the challenge',
-                'solve the puzzle',
-                'anti-bot verification'
-            ]
-        }
-        
-        content_lower = html_content.lower()
+        return self._find_captcha(html_content.lower())
+    
+    def _find_captcha(self, content_lower: str) -> Dict[str, Any]:
+        """Check already-lowercased content for CAPTCHA markers"""
         found_indicators = []
         captcha_types = []
         
-        for captcha_type, indicators in captcha_indicators.items():
-            type_found = False
-            for indicator in indicators:
-                if indicator in content_lower:
-                    found_indicators.append(indicator)
-                    if not type_found:
-                        captcha_types.append(captcha_type)
-                        type_found = True
+        for captcha_type, scans in CAPTCHA_SCANS.items():
+            type_found = []
+            for indicator, required in scans:
+                if (required is None or required in type_found) and indicator in content_lower:
+                    type_found.append(indicator)
+            if type_found:
+                captcha_types.append(captcha_type)
+                found_indicators.extend(type_found)
         
         return {
             'present': len(found_indicators) > 0,
@@ -595,9 +658,11 @@ class StealthScraper:
         Returns:
             dict: Summary of all detected issues
         """
+        # Lowercase once and share it across every indicator check
+        content_lower = html_content.lower()
         issues = {
-            'bot_detected': self.is_bot_detected(html_content),
-            'captcha': self.is_captcha_present(html_content),
+            'bot_detected': self._has_bot_indicator(content_lower),
+            'captcha': self._find_captcha(content_lower),
             'empty_content': len(html_content.strip()) < 100,
             'error_page': False,
             'redirect_loop': False,
@@ -605,27 +670,10 @@ class StealthScraper:
         }
         
         # Check for error pages
-        error_indicators = [
-            '404 not found',
-            '403 forbidden',
-            '500 internal server error',
-            'page not found',
-            'access forbidden',
-            'server error'
-        ]
-        
-        content_lower = html_content.lower()
-        issues['error_page'] = any(indicator in content_lower for indicator in error_indicators)
+        issues['error_page'] = any(indicator in content_lower for indicator in ERROR_PAGE_INDICATORS)
         
         # Check for timeout/loading issues
-        timeout_indicators = [
-            'timeout',
-            'took too long to respond',
-            'connection timed out',
-            'request timeout'
-        ]
-        
-        issues['timeout_page'] = any(indicator in content_lower for indicator in timeout_indicators)
+        issues['timeout_page'] = any(indicator in content_lower for indicator in TIMEOUT_PAGE_INDICATORS)
         
         return issues
 
@@ -714,17 +762,19 @@ class StealthScraper:
             except Exception as e:
                 elapsed_time = time.time() - start_time
                 error_type = type(e).__name__
-                self.logger.error(f"Firecrawl exception ({error_type}) for {url} after {elapsed_time:.2f}s: {str(e)}")
+                error_text = str(e)
+                self.logger.error(f"Firecrawl exception ({error_type}) for {url} after {elapsed_time:.2f}s: {error_text}")
                 
                 # Add specific handling for timeout errors
-                if "timeout" in str(e).lower() or "timed out" in str(e).lower():
+                error_lower = error_text.lower()
+                if "timeout" in error_lower or "timed out" in error_lower:
                     self.logger.error(f"Firecrawl timeout detected for {url} - consider increasing timeout or checking target site responsiveness")
                 
                 return ScrapeResult(
                     url=url,
                     success=False,
                     status_code=500,
-                    error_reason=f"{error_type}: {str(e)}",
+                    error_reason=f"{error_type}: {error_text}",
                     methods_tried={ScrapingMethod.FIRECRAWL},
                     final_method=ScrapingMethod.FIRECRAWL,
                     final_url=url,
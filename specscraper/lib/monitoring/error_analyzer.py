@@ -1,11 +1,85 @@
 """Error analysis and categorization for pipeline monitoring"""
+import csv
+import heapq
 import json
+import re
 from collections import defaultdict
+from functools import lru_cache
+from operator import itemgetter
 from typing import List, Dict, Any, Optional, Tuple
 from pathlib import Path
-import pandas as pd
 from .models import PipelineError, ErrorCategory, PipelineExecution, PipelineStage
 
+# Column order for export_error_analysis
+ERROR_EXPORT_COLUMNS = (
+    "execution_id", "timestamp", "category", "stage", "url",
+    "error_message", "additional_info"
+)
+
+# Patterns used to normalize error messages for grouping
+URL_PATTERN = re.compile(r'https?://\S+')
+NUMBER_PATTERN = re.compile(r'\b\d{3,}\b')
+PATH_PATTERN = re.compile(r'[/\\][\w/\\.-]+')
+
+# Resolution suggestions shown for each error category
+ERROR_RESOLUTION_SUGGESTIONS = {
+    ErrorCategory.BOT_DETECTION: (
+        "Consider using Firecrawl as fallback for this URL",
+        "Add more realistic browser headers and behaviors",
+        "Implement random delays between requests",
+        "Check if the site requires specific cookies or session data"
+    ),
+    ErrorCategory.RATE_LIMIT: (
+        "Reduce concurrent workers in ThreadPoolExecutor",
+        "Implement exponential backoff for retries",
+        "Add delays between requests to the same domain",
+        "Consider spreading requests over a longer time period"
+    ),
+    ErrorCategory.NETWORK_ERROR: (
+        "Check network connectivity and DNS resolution",
+        "Increase timeout values for slow-loading sites",
+        "Implement retry logic with backoff",
+        "Verify SSL certificates are valid"
+    ),
+    ErrorCategory.FIRECRAWL_ERROR: (
+        "Check Firecrawl API token balance",
+        "Reduce the number of Firecrawl requests",
+        "Cache successful Firecrawl results",
+        "Consider upgrading Firecrawl plan for more tokens"
+    ),
+    ErrorCategory.LLM_ERROR: (
+        "Verify OpenAI API key is valid",
+        "Check OpenAI API rate limits and quotas",
+        "Reduce prompt size if hitting token limits",
+        "Implement retry logic for transient API errors"
+    ),
+    ErrorCategory.VALIDATION_ERROR: (
+        "Review the HTML cleaning process",
+        "Check if website structure has changed",
+        "Validate that all required fields are extracted",
+        "Consider more robust error handling in extraction"
+    )
+}
+
+
+@lru_cache(maxsize=1024)
+def _normalize_error_message(message: str) -> str:
+    """Normalize error message for grouping similar errors"""
+    # Remove URLs
+    message = URL_PATTERN.sub('<URL>', message)
+    
+    # Remove numbers that might be IDs or codes
+    message = NUMBER_PATTERN.sub('<NUMBER>', message)
+    
+    # Remove file paths
+    message = PATH_PATTERN.sub('<PATH>', message)
+    
+    # Truncate very long messages
+    if len(message) > 100:
+        message = message[:100] + "..."
+        
+    return message.strip()
+
 
 class ErrorAnalyzer:
     """Analyzes and categorizes errors from pipeline executions"""
@@ -36,59 +110,57 @@ class ErrorAnalyzer:
                 "format error", "type error"
             ]
         }
+        
+        # Pipelines repeat the same few messages, so memoize categorization per analyzer
+        self._categorize_cached = lru_cache(maxsize=1024)(self._categorize_uncached)
     
     def analyze_errors(self, executions: List[PipelineExecution]) -> Dict[str, Any]:
         """Analyze errors across multiple executions"""
-        all_errors = []
-        for execution in executions:
-            all_errors.extend(execution.errors)
-        
-        if not all_errors:
-            return {"total_errors": 0, "error_analysis": {}}
-        
-        # Group by category
+        # Group errors by category, stage, message, hour and URL in one pass
         errors_by_category = defaultdict(list)
-        for error in all_errors:
-            errors_by_category[error.category.value].append(error)
-        
-        # Group by stage
         errors_by_stage = defaultdict(list)
-        for error in all_errors:
-            errors_by_stage[error.stage.value].append(error)
-        
-        # Find most common error messages
         error_messages = defaultdict(int)
-        for error in all_errors:
-            # Normalize error message for grouping
-            normalized = self._normalize_error_message(error.error_message)
-            error_messages[normalized] += 1
+        error_timeline = defaultdict(int)
+        url_errors = defaultdict(int)
+        total_errors = 0
         
-        # Analyze error patterns over time
-        error_timeline = self._create_error_timeline(all_errors)
+        for execution in executions:
+            for error in execution.errors:
+                total_errors += 1
+                errors_by_category[error.category.value].append(error)
+                errors_by_stage[error.stage.value].append(error)
+                # Normalize error message for grouping
+                error_messages[self._normalize_error_message(error.error_message)] += 1
+                error_timeline[error.timestamp.strftime("%Y-%m-%d %H:00")] += 1
+                if error.url:
+                    url_errors[error.url] += 1
+        
+        if not total_errors:
+            return {"total_errors": 0, "error_analysis": {}}
         
         # Generate actionable insights
         insights = self._generate_insights(errors_by_category, errors_by_stage)
         
         return {
-            "total_errors": len(all_errors),
+            "total_errors": total_errors,
             "errors_by_category": {
                 cat: len(errors) for cat, errors in errors_by_category.items()
             },
             "errors_by_stage": {
                 stage: len(errors) for stage, errors in errors_by_stage.items()
             },
-            "top_error_messages": dict(sorted(
-                error_messages.items(), 
-                key=lambda x: x[1], 
-                reverse=True
-            )[:10]),
-            "error_timeline": error_timeline,
+            "top_error_messages": dict(heapq.nlargest(10, error_messages.items(), key=itemgetter(1))),
+            "error_timeline": dict(sorted(error_timeline.items())),
             "insights": insights,
-            "affected_urls": self._get_affected_urls(all_errors)
+            "affected_urls": dict(sorted(url_errors.items(), key=lambda x: x[1], reverse=True))
         }
     
     def categorize_error_message(self, error_message: str) -> ErrorCategory:
         """Categorize an error message based on patterns"""
+        return self._categorize_cached(error_message)
+    
+    def _categorize_uncached(self, error_message: str) -> ErrorCategory:
+        """Match an error message against the category patterns"""
         error_lower = error_message.lower()
         
         for category, patterns in self.error_patterns.items():
@@ -144,80 +216,11 @@ class ErrorAnalyzer:
     
     def get_error_resolution_suggestions(self, error: PipelineError) -> List[str]:
         """Get suggestions for resolving specific errors"""
-        suggestions = []
-        
-        if error.category == ErrorCategory.BOT_DETECTION:
-            suggestions.extend([
-                "Consider using Firecrawl as fallback for this URL",
-                "Add more realistic browser headers and behaviors",
-                "Implement random delays between requests",
-                "Check if the site requires specific cookies or session data"
-            ])
-        elif error.category == ErrorCategory.RATE_LIMIT:
-            suggestions.extend([
-                "Reduce concurrent workers in ThreadPoolExecutor",
-                "Implement exponential backoff for retries",
-                "Add delays between requests to the same domain",
-                "Consider spreading requests over a longer time period"
-            ])
-        elif error.category == ErrorCategory.NETWORK_ERROR:
-            suggestions.extend([
-                "Check network connectivity and DNS resolution",
-                "Increase timeout values for slow-loading sites",
-                "Implement retry logic with backoff",
-                "Verify SSL certificates are valid"
-            ])
-        elif error.category == ErrorCategory.FIRECRAWL_ERROR:
-            suggestions.extend([
-                "Check Firecrawl API token balance",
-                "Reduce the number of Firecrawl requests",
-                "Cache successful Firecrawl results",
-                "Consider upgrading Firecrawl plan for more tokens"
-            ])
-        elif error.category == ErrorCategory.LLM_ERROR:
-            suggestions.extend([
-                "Verify OpenAI API key is valid",
-                "Check OpenAI API rate limits and quotas",
-                "Reduce prompt size if hitting token limits",
-                "Implement retry logic for transient API errors"
-            ])
-        elif error.category == ErrorCategory.VALIDATION_ERROR:
-            suggestions.extend([
-                "Review the HTML cleaning process",
-                "Check if website structure has changed",
-                "Validate that all required fields are extracted",
-                "Consider more robust error handling in extraction"
-            ])
-        
-        return suggestions
+        return list(ERROR_RESOLUTION_SUGGESTIONS.get(error.category, ()))
     
     def _normalize_error_message(self, message: str) -> str:
         """Normalize error message for grouping similar errors"""
-        # Remove URLs
-        import re
-        message = re.sub(r'https?://\S+', '<URL>', message)
-        
-        # Remove numbers that might be IDs or codes
-        message = re.sub(r'\b\d{3,}\b', '<NUMBER>', message)
-        
-        # Remove file paths
-        message = re.sub(r'[/\\][\w/\\.-]+', '<PATH>', message)
-        
-        # Truncate very long messages
-        if len(message) > 100:
-            message = message[:100] + "..."
-            
-        return message.strip()
-    
-    def _create_error_timeline(self, errors: List[PipelineError]) -> Dict[str, int]:
-        """Create timeline of errors by hour"""
-        timeline = defaultdict(int)
-        
-        for error in errors:
-            hour_key = error.timestamp.strftime("%Y-%m-%d %H:00")
-            timeline[hour_key] += 1
-            
-        return dict(sorted(timeline.items()))
+        return _normalize_error_message(message)
     
     def _generate_insights(self, errors_by_category: Dict[str, List[PipelineError]], 
                          errors_by_stage: Dict[str, List[PipelineError]]) -> List[str]:
@@ -263,35 +266,28 @@ class ErrorAnalyzer:
         
         return insights
     
-    def _get_affected_urls(self, errors: List[PipelineError]) -> Dict[str, int]:
-        """Get URLs most affected by errors"""
-        url_errors = defaultdict(int)
-        
-        for error in errors:
-            if error.url:
-                url_errors[error.url] += 1
-                
-        return dict(sorted(url_errors.items(), key=lambda x: x[1], reverse=True))
-    
     def export_error_analysis(self, executions: List[PipelineExecution], output_path: str):
         """Export detailed error analysis to CSV"""
-        all_errors = []
-        
-        for execution in executions:
-            for error in execution.errors:
-                all_errors.append({
-                    "execution_id": execution.execution_id,
-                    "timestamp": error.timestamp,
-                    "category": error.category.value,
-                    "stage": error.stage.value,
-                    "url": error.url,
-                    "error_message": error.error_message,
-                    "additional_info": json.dumps(error.additional_info)
-                })
+        all_errors = [
+            (
+                execution.execution_id,
+                error.timestamp,
+                error.category.value,
+                error.stage.value,
+                error.url,
+                error.error_message,
+                json.dumps(error.additional_info)
+            )
+            for execution in executions
+            for error in execution.errors
+        ]
         
         if all_errors:
-            df = pd.DataFrame(all_errors)
-            df.to_csv(output_path, index=False)
+            # Plain tabular rows, so write them directly without a DataFrame
+            with open(output_path, 'w', newline='', encoding='utf-8') as f:
+                writer = csv.writer(f)
+                writer.writerow(ERROR_EXPORT_COLUMNS)
+                writer.writerows(all_errors)
             return output_path
         
         return None
\ No newline at end of file
@@ -7,6 +7,26 @@ from typing import Dict, List, Any, Optional
 import pandas as pd
 from .models import PipelineMetric, PipelineExecution, MetricType
 
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+# Datetimes pass through to default=str so compact output matches the json module's;
+# non-string keys are encoded natively
+ORJSON_OPTIONS = (
+    orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS
+    if ORJSON_AVAILABLE else 0
+)
+
+# Report names for scraping methods; anything else is shown title-cased
+METHOD_DISPLAY_NAMES = {
+    "requests": "Requests Library",
+    "firecrawl": "Firecrawl API",
+    "cached": "Cached Content",
+}
+
 
 class MetricsCollector:
     """Collects and aggregates metrics from pipeline executions"""
@@ -37,41 +57,46 @@ class MetricsCollector:
         # Convert to DataFrame for easier aggregation
         df = pd.DataFrame(all_metrics)
         
-        # Aggregate by metric name
+        # Aggregate by metric name; pandas results are converted to Python floats so
+        # the json and orjson writers encode them the same way
         aggregations = {}
         
-        for metric_name in df['name'].unique():
-            metric_data = df[df['name'] == metric_name]
+        # One groupby pass instead of a boolean mask per metric name
+        for metric_name, metric_data in df.groupby('name', sort=False):
             metric_type = metric_data['type'].iloc[0]
+            values = metric_data['value']
             
             if metric_type == MetricType.COUNTER.value:
                 # Sum counters
                 aggregations[metric_name] = {
                     "type": "counter",
-                    "total": metric_data['value'].sum(),
+                    "total": float(values.sum()),
                     "count": len(metric_data),
-                    "by_execution": metric_data.groupby('execution_id')['value'].sum().to_dict()
+                    "by_execution": values.groupby(metric_data['execution_id']).sum().to_dict()
                 }
             elif metric_type == MetricType.GAUGE.value:
                 # Average gauges
+                stats = values.agg(['mean', 'min', 'max', 'std'])
                 aggregations[metric_name] = {
                     "type": "gauge",
-                    "mean": metric_data['value'].mean(),
-                    "min": metric_data['value'].min(),
-                    "max": metric_data['value'].max(),
-                    "std": metric_data['value'].std(),
+                    "mean": float(stats['mean']),
+                    "min": float(stats['min']),
+                    "max": float(stats['max']),
+                    # Undefined for a single sample; null rather than a non-JSON NaN
+                    "std": None if pd.isna(stats['std']) else float(stats['std']),
                     "count": len(metric_data)
                 }
             elif metric_type == MetricType.HISTOGRAM.value:
-                # Calculate percentiles for histograms
+                # Calculate percentiles for histograms in a single quantile pass
+                p50, p95, p99 = map(float, values.quantile([0.5, 0.95, 0.99]))
                 aggregations[metric_name] = {
                     "type": "histogram",
-                    "mean": metric_data['value'].mean(),
-                    "p50": metric_data['value'].quantile(0.5),
-                    "p95": metric_data['value'].quantile(0.95),
-                    "p99": metric_data['value'].quantile(0.99),
-                    "min": metric_data['value'].min(),
-                    "max": metric_data['value'].max(),
+                    "mean": float(values.mean()),
+                    "p50": p50,
+                    "p95": p95,
+                    "p99": p99,
+                    "min": float(values.min()),
+                    "max": float(values.max()),
                     "count": len(metric_data)
                 }
         
@@ -182,14 +207,7 @@ class MetricsCollector:
         report.append("## Scraping Method Breakdown")
         if stats['scraping_methods']:
             for method, count in stats['scraping_methods'].items():
-                if method == "requests":
-                    report.append(f"- Requests Library: {count}")
-                elif method == "firecrawl":
-                    report.append(f"- Firecrawl API: {count}")
-                elif method == "cached":
-                    report.append(f"- Cached Content: {count}")
-                else:
-                    report.append(f"- {method.title()}: {count}")
+                report.append(f"- {METHOD_DISPLAY_NAMES.get(method) or method.title()}: {count}")
         else:
             report.append("- No scraping method data available")
         report.append("")
@@ -213,7 +231,7 @@ class MetricsCollector:
         if stats['errors_by_method']:
             report.append("## Errors by Scraping Method")
             for method, errors in stats['errors_by_method'].items():
-                method_name = "Requests Library" if method == "requests" else "Firecrawl API" if method == "firecrawl" else method.title()
+                method_name = METHOD_DISPLAY_NAMES.get(method) or method.title()
                 report.append(f"### {method_name}")
                 total_errors = sum(errors.values())
                 report.append(f"- Total Errors: {total_errors}")
@@ -242,8 +260,9 @@ class MetricsCollector:
         
         return "\n".join(report)
     
-    def save_aggregated_metrics(self, executions: List[PipelineExecution], filename: str = "aggregated_metrics.json"):
-        """Save aggregated metrics to file"""
+    def save_aggregated_metrics(self, executions: List[PipelineExecution], filename: str = "aggregated_metrics.json",
+                                compact: bool = False):
+        """Save aggregated metrics to file (compact JSON for machine consumers)"""
         stats = self.calculate_summary_stats(executions)
         metrics = self.aggregate_metrics(executions)
         
@@ -254,8 +273,15 @@ class MetricsCollector:
         }
         
         filepath = self.metrics_dir / filename
+        if compact and ORJSON_AVAILABLE:
+            filepath.write_bytes(orjson.dumps(data, default=str, option=ORJSON_OPTIONS))
+            return filepath
+        
         with open(filepath, 'w') as f:
-            json.dump(data, f, indent=2, default=str)
+            if compact:
+                json.dump(data, f, separators=(',', ':'), default=str)
+            else:
+                json.dump(data, f, indent=2, default=str)
         
         return filepath
     
@@ -265,9 +291,7 @@ class MetricsCollector:
         
         for file in self.metrics_dir.glob("exec_*.json"):
             try:
-                with open(file, 'r') as f:
-                    data = json.load(f)
-                execution = PipelineExecution.model_validate(data)
+                execution = PipelineExecution.model_validate_json(file.read_bytes())
                 executions.append(execution)
             except Exception as e:
                 print(f"Error loading {file}: {e}")
@@ -1,10 +1,10 @@
 """Pipeline monitoring system for tracking execution and collecting metrics"""
-import json
 import logging
 import os
+from collections import deque
 from datetime import datetime
 from pathlib import Path
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, List, Deque
 from ..core.scraping import ScrapeResult, PageIssue
 from .models import (
     PipelineExecution, PipelineMetric, PipelineError, 
@@ -17,11 +17,12 @@ logger = logging.getLogger(__name__)
 class PipelineMonitor:
     """Monitors pipeline execution and collects metrics"""
     
-    def __init__(self, metrics_dir: str = "data/metrics"):
+    def __init__(self, metrics_dir: str = "data/metrics", max_history: int = 50):
         self.metrics_dir = Path(metrics_dir)
         self.metrics_dir.mkdir(exist_ok=True, parents=True)
         self.current_execution: Optional[PipelineExecution] = None
-        self.executions: List[PipelineExecution] = []
+        # Recent executions only; older ones remain loadable from metrics_dir
+        self.executions: Deque[PipelineExecution] = deque(maxlen=max_history)
         
     def start_execution(self, total_urls: int) -> str:
         """Start a new pipeline execution"""
@@ -317,9 +318,12 @@ class PipelineMonitor:
             return ErrorCategory.BOT_DETECTION
         elif PageIssue.TIMEOUT in result.page_issues:
             return ErrorCategory.NETWORK_ERROR
-        elif result.error_reason and "rate" in result.error_reason.lower():
+        
+        # Lowercase the reason once for both keyword checks
+        reason_lower = result.error_reason.lower() if result.error_reason else ""
+        if "rate" in reason_lower:
             return ErrorCategory.RATE_LIMIT
-        elif result.error_reason and "firecrawl" in result.error_reason.lower():
+        elif "firecrawl" in reason_lower:
             return ErrorCategory.FIRECRAWL_ERROR
         else:
             return ErrorCategory.UNKNOWN_ERROR
@@ -327,8 +331,8 @@ class PipelineMonitor:
     def _save_execution(self, execution: PipelineExecution):
         """Save execution data to file"""
         filename = self.metrics_dir / f"{execution.execution_id}.json"
-        with open(filename, 'w') as f:
-            json.dump(execution.model_dump(mode='json'), f, indent=2, default=str)
+        with open(filename, 'w', encoding='utf-8') as f:
+            f.write(execution.model_dump_json(indent=2))
         logger.info(f"Saved execution metrics to {filename}")
     
     def load_execution(self, execution_id: str) -> Optional[PipelineExecution]:
@@ -337,6 +341,4 @@ class PipelineMonitor:
         if not filename.exists():
             return None
             
-        with open(filename, 'r') as f:
-            data = json.load(f)
-        return PipelineExecution.model_validate(data)
\ No newline at end of file
+        return PipelineExecution.model_validate_json(filename.read_bytes())
\ No newline at end of file
@@ -17,6 +17,11 @@ from datetime import datetime, timezone
 
 Level = Literal["debug", "info", "warn", "error"]
 
+# Shared compact encoder for event lines; json.dumps with custom options
+# would build a new JSONEncoder for every event. repr handles values that
+# aren't JSON-serializable.
+_EVENT_ENCODER = json.JSONEncoder(default=repr, separators=(',', ':'))
+
 
 class TokenBucketRateLimiter:
     """
@@ -72,6 +77,25 @@ class TokenBucketRateLimiter:
             return count
 
 
+# Redaction patterns, compiled once and applied in order
+REDACTION_PATTERNS = (
+    # URLs with authentication (user:pass@host) - must come before email
+    (re.compile(r'https?://[^:/\s]+:[^@/\s]+@[^\s]+'), '[AUTH_URL]'),
+
+    # Email addresses
+    (re.compile(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b'), '[EMAIL]'),
+
+    # URL query parameters with sensitive data
+    (re.compile(r'([?&])(token|key|secret|auth)=[^&\s]+'), r'\1\2=[REDACTED]'),
+
+    # API keys and tokens (common patterns)
+    (re.compile(r'\b(sk-[a-zA-Z0-9]{10,}|pk_[a-zA-Z0-9_]{10,})\b'), '[API_KEY]'),
+
+    # Common secret patterns - any long alphanumeric string
+    (re.compile(r'\b[A-Za-z0-9]{32,}\b'), '[TOKEN]'),
+)
+
+
 class PIIRedactor:
     """
     Redacts personally identifiable information and sensitive data from log messages.
@@ -80,30 +104,12 @@ class PIIRedactor:
     """
 
     def __init__(self):
-        self.patterns = [
-            # URLs with authentication (user:pass@host) - must come before email
-            (re.compile(r'https?://[^:/\s]+:[^@/\s]+@[^\s]+'), '[AUTH_URL]'),
-
-            # Email addresses
-            (re.compile(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b'), '[EMAIL]'),
-
-            # URL query parameters with sensitive data
-            (re.compile(r'([?&])(token|key|secret|auth)=[^&\s]+'), r'\1\2=[REDACTED]'),
-
-            # API keys and tokens (common patterns)
-            (re.compile(r'\b(sk-[a-zA-Z0-9]{10,}|pk_[a-zA-Z0-9_]{10,})\b'), '[API_KEY]'),
-
-            # Common secret patterns - any long alphanumeric string
-            (re.compile(r'\b[A-Za-z0-9]{32,}\b'), '[TOKEN]'),
-        ]
+        self.patterns = list(REDACTION_PATTERNS)
 
     def redact(self, text: str) -> str:
         """Apply redaction patterns to text."""
         for pattern, replacement in self.patterns:
-            if callable(replacement):
-                text = pattern.sub(replacement, text)
-            else:
-                text = pattern.sub(replacement, text)
+            text = pattern.sub(replacement, text)
         return text
 
     def redact_dict(self, data: Dict[str, Any]) -> Dict[str, Any]:
@@ -203,8 +209,7 @@ class Event:
             if "ctx" in data:
                 data["ctx"] = redactor.redact_dict(data["ctx"])
 
-        # Use repr as default to handle non-serializable objects
-        return json.dumps(data, default=repr, separators=(',', ':'))
+        return _EVENT_ENCODER.encode(data)
 
 
 class EventEmitter:
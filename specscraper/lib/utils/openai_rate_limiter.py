@@ -1,8 +1,8 @@
 import time
 import threading
-from typing import Dict, Any
+from typing import Deque, Dict, Any, Tuple
 from dataclasses import dataclass
-from collections import defaultdict
+from collections import defaultdict, deque
 import logging
 import os
 
@@ -51,9 +51,9 @@ class OpenAIRateLimiter:
         """Initialize the rate limiter"""
         self.lock = threading.Lock()
         
-        # Track requests and tokens per model
-        self.request_history: Dict[str, list] = defaultdict(list)
-        self.token_history: Dict[str, list] = defaultdict(list)
+        # Track requests and tokens per model, oldest first, on the monotonic clock
+        self.request_history: Dict[str, Deque[float]] = defaultdict(deque)
+        self.token_history: Dict[str, Deque[Tuple[float, int]]] = defaultdict(deque)
         
         # Current usage counters
         self.current_requests: Dict[str, int] = defaultdict(int)
@@ -69,52 +69,51 @@ class OpenAIRateLimiter:
         """Remove entries older than 60 seconds"""
         cutoff_time = current_time - 60
         
-        # Clean request history
-        self.request_history[model] = [
-            timestamp for timestamp in self.request_history[model]
-            if timestamp > cutoff_time
-        ]
+        # Histories are time-ordered, so expired entries are always at the front
+        request_history = self.request_history[model]
+        while request_history and request_history[0] <= cutoff_time:
+            request_history.popleft()
         
-        # Clean token history  
-        self.token_history[model] = [
-            (timestamp, tokens) for timestamp, tokens in self.token_history[model]
-            if timestamp > cutoff_time
-        ]
+        token_history = self.token_history[model]
+        expired_tokens = 0
+        while token_history and token_history[0][0] <= cutoff_time:
+            expired_tokens += token_history.popleft()[1]
         
         # Update current counters
-        self.current_requests[model] = len(self.request_history[model])
-        self.current_tokens[model] = sum(
-            tokens for _, tokens in self.token_history[model]
-        )
+        self.current_requests[model] = len(request_history)
+        self.current_tokens[model] -= expired_tokens
     
-    def _calculate_wait_time(self, model: str, estimated_tokens: int) -> float:
+    def _calculate_wait_time(self, model: str, estimated_tokens: int, rate_limit: RateLimit) -> float:
         """Calculate how long to wait before making the request"""
-        rate_limit = self._get_rate_limit(model)
-        current_time = time.time()
+        current_time = time.monotonic()
         
         # Clean old entries
         self._clean_old_entries(model, current_time)
         
+        # Per-model state is looked up once rather than on every check
+        token_history = self.token_history[model]
+        projected_tokens = self.current_tokens[model] + estimated_tokens
+        tokens_per_minute = rate_limit.tokens_per_minute
+        
         wait_times = []
         
         # Check RPM limit
         if self.current_requests[model] >= rate_limit.requests_per_minute:
-            oldest_request = min(self.request_history[model])
+            oldest_request = self.request_history[model][0]
             wait_time_rpm = 60 - (current_time - oldest_request)
             if wait_time_rpm > 0:
                 wait_times.append(wait_time_rpm)
         
         # Check TPM limit
-        if self.current_tokens[model] + estimated_tokens > rate_limit.tokens_per_minute:
-            if self.token_history[model]:
+        if projected_tokens > tokens_per_minute:
+            if token_history:
                 # Find when we'll have enough token budget
-                needed_tokens = (self.current_tokens[model] + estimated_tokens) - rate_limit.tokens_per_minute
+                needed_tokens = projected_tokens - tokens_per_minute
                 
-                # Sort by timestamp to find oldest tokens that need to expire
-                sorted_tokens = sorted(self.token_history[model], key=lambda x: x[0])
+                # Walk the oldest tokens until enough budget would expire
                 tokens_to_expire = 0
                 
-                for timestamp, tokens in sorted_tokens:
+                for timestamp, tokens in token_history:
                     tokens_to_expire += tokens
                     if tokens_to_expire >= needed_tokens:
                         wait_time_tpm = 60 - (current_time - timestamp)
@@ -132,28 +131,33 @@ class OpenAIRateLimiter:
             model: The OpenAI model name
             estimated_tokens: Estimated tokens for the request (input + expected output)
         """
+        rate_limit = self._get_rate_limit(model)
+        
         with self.lock:
-            wait_time = self._calculate_wait_time(model, estimated_tokens)
+            wait_time = self._calculate_wait_time(model, estimated_tokens, rate_limit)
             
             if wait_time > 0:
                 logger.info(f"Rate limit reached for {model}. Waiting {wait_time:.2f} seconds...")
                 time.sleep(wait_time)
                 # Recalculate after waiting
-                self._clean_old_entries(model, time.time())
+                self._clean_old_entries(model, time.monotonic())
             
             # Record the request
-            current_time = time.time()
+            current_time = time.monotonic()
             self.request_history[model].append(current_time)
             self.token_history[model].append((current_time, estimated_tokens))
             
             # Update counters
-            self.current_requests[model] += 1
-            self.current_tokens[model] += estimated_tokens
+            current_requests = self.current_requests[model] + 1
+            current_tokens = self.current_tokens[model] + estimated_tokens
+            self.current_requests[model] = current_requests
+            self.current_tokens[model] = current_tokens
             
-            rate_limit = self._get_rate_limit(model)
-            logger.debug(f"Acquired rate limit for {model}: "
-                        f"requests={self.current_requests[model]}/{rate_limit.requests_per_minute}, "
-                        f"tokens={self.current_tokens[model]}/{rate_limit.tokens_per_minute}")
+            # Skip building the message on every call when debug logging is off
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug(f"Acquired rate limit for {model}: "
+                            f"requests={current_requests}/{rate_limit.requests_per_minute}, "
+                            f"tokens={current_tokens}/{rate_limit.tokens_per_minute}")
     
     def update_actual_tokens(self, model: str, actual_tokens: int, estimated_tokens: int) -> None:
         """
@@ -166,14 +170,15 @@ class OpenAIRateLimiter:
         """
         with self.lock:
             # Find and update the most recent token entry
-            if self.token_history[model]:
+            token_history = self.token_history[model]
+            if token_history:
                 # Update the most recent entry
-                last_entry = self.token_history[model][-1]
-                timestamp = last_entry[0]
-                self.token_history[model][-1] = (timestamp, actual_tokens)
+                timestamp, recorded_tokens = token_history[-1]
+                token_history[-1] = (timestamp, actual_tokens)
                 
-                # Update current counter
-                self.current_tokens[model] = self.current_tokens[model] - estimated_tokens + actual_tokens
+                # Update current counter by what the entry actually held, so the
+                # running total stays equal to the history's sum
+                self.current_tokens[model] += actual_tokens - recorded_tokens
                 
                 logger.debug(f"Updated token usage for {model}: "
                            f"estimated={estimated_tokens}, actual={actual_tokens}")
@@ -181,7 +186,7 @@ class OpenAIRateLimiter:
     def get_usage_stats(self, model: str) -> Dict[str, Any]:
         """Get current usage statistics for a model"""
         with self.lock:
-            current_time = time.time()
+            current_time = time.monotonic()
             self._clean_old_entries(model, current_time)
             
             rate_limit = self._get_rate_limit(model)
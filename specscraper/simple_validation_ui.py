@@ -9,22 +9,16 @@ import pandas as pd
 import json
 from datetime import datetime
 import os
-from io import StringIO
 import numpy as np
-import sys
+import threading
 import traceback
+from concurrent.futures import ThreadPoolExecutor
 
-# Add lib directory to path for imports
-lib_path = os.path.join(os.path.dirname(__file__), 'lib')
-sys.path.insert(0, lib_path)
-
+# Import through the lib package (this script's directory is already on sys.path)
+# so these share module objects with lib.core.llm's own imports
 try:
-    import core.llm as llm_module
-    import utils.openai_rate_limiter as rate_limiter_module
-    
-    LLMInvocator = llm_module.LLMInvocator
-    PromptTemplator = llm_module.PromptTemplator
-    OpenAIRateLimiter = rate_limiter_module.OpenAIRateLimiter
+    from lib.core.llm import LLMInvocator, PromptTemplator
+    from lib.utils.openai_rate_limiter import OpenAIRateLimiter
     print("✓ LLM components imported successfully")
 except ImportError as e:
     print(f"Warning: Could not import LLM modules: {e}")
@@ -42,11 +36,17 @@ validation_state = {
     'failed_rows': set(),
     'stats': {'total_rows': 0, 'failed_rows': 0, 'field_failures': {}}
 }
+# Requests are served on several threads; check-then-update edits of the
+# validation state hold this so concurrent clicks can't double-count a failure
+validation_lock = threading.Lock()
 
 # LLM integration storage and instances
 llm_invocator = None
 llm_results_history = {}  # {product_index: [{"timestamp": "", "model": "", "result": {}, "error": ""}]}
 
+# The llm_results columns /get_product returns; the rest of the row is never read
+PRODUCT_LLM_COLUMNS = ('html_content', 'prompt', 'product_url', 'success')
+
 # Initialize LLM components
 def init_llm_components():
     global llm_invocator
@@ -83,8 +83,13 @@ def load_data():
         if not os.path.exists(product_specs_path):
             return jsonify({'error': f'Product specs file not found: {product_specs_path}'}), 404
         
-        llm_results_df = pd.read_csv(llm_results_path)
-        product_specs_df = pd.read_csv(product_specs_path)
+        # The files are independent, so read them concurrently; pandas releases
+        # the GIL while tokenizing, so the parses overlap
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            llm_results_future = executor.submit(pd.read_csv, llm_results_path)
+            product_specs_future = executor.submit(pd.read_csv, product_specs_path)
+            llm_results_df = llm_results_future.result()
+            product_specs_df = product_specs_future.result()
         
         # Fill NaN values to avoid JSON serialization issues
         llm_results_df = llm_results_df.fillna('')
@@ -127,14 +132,11 @@ def get_table_data():
     if product_specs_df is None:
         return jsonify({'error': 'No data loaded'}), 400
     
-    # Convert to records and add row indices
-    data = []
-    for idx, row in product_specs_df.iterrows():
-        row_data = {
-            'row_idx': idx,
-            'data': row.to_dict()
-        }
-        data.append(row_data)
+    # Convert to records in one pass and add row indices
+    data = [
+        {'row_idx': idx, 'data': record}
+        for idx, record in zip(product_specs_df.index.tolist(), product_specs_df.to_dict('records'))
+    ]
     
     return jsonify({
         'data': data,
@@ -155,11 +157,12 @@ def get_product(index):
         return jsonify({'error': 'Invalid product index'}), 400
     
     try:
-        llm_row = llm_results_df.iloc[index]
         spec_row = product_specs_df.iloc[index]
         
-        # Convert pandas Series to dict and handle numpy types
-        llm_dict = _convert_numpy_types(llm_row.to_dict())
+        # Read only the needed cells rather than materializing the whole row
+        llm_dict = _convert_numpy_types({
+            col: llm_results_df[col].iat[index] for col in PRODUCT_LLM_COLUMNS if col in llm_results_df
+        })
         spec_dict = _convert_numpy_types(spec_row.to_dict())
         
         response_data = {
@@ -280,28 +283,29 @@ def reject_cell():
     if row_idx is None or column is None:
         return jsonify({'error': 'Missing row_idx or column'}), 400
     
-    # Update validation state
-    if row_idx not in validation_state['failed_cells']:
-        validation_state['failed_cells'][row_idx] = {}
-    
-    if rejected:
-        # Only increment if cell wasn't already failed
-        if column not in validation_state['failed_cells'][row_idx]:
-            validation_state['failed_cells'][row_idx][column] = True
-            validation_state['stats']['field_failures'][column] += 1
+    with validation_lock:
+        # Update validation state
+        if row_idx not in validation_state['failed_cells']:
+            validation_state['failed_cells'][row_idx] = {}
+        
+        if rejected:
+            # Only increment if cell wasn't already failed
+            if column not in validation_state['failed_cells'][row_idx]:
+                validation_state['failed_cells'][row_idx][column] = True
+                validation_state['stats']['field_failures'][column] += 1
+            else:
+                validation_state['failed_cells'][row_idx][column] = True
         else:
-            validation_state['failed_cells'][row_idx][column] = True
-    else:
-        if column in validation_state['failed_cells'][row_idx]:
-            del validation_state['failed_cells'][row_idx][column]
-            validation_state['stats']['field_failures'][column] -= 1
+            if column in validation_state['failed_cells'][row_idx]:
+                del validation_state['failed_cells'][row_idx][column]
+                validation_state['stats']['field_failures'][column] -= 1
+            
+            # Clean up empty row entries
+            if not validation_state['failed_cells'][row_idx]:
+                del validation_state['failed_cells'][row_idx]
         
-        # Clean up empty row entries
-        if not validation_state['failed_cells'][row_idx]:
-            del validation_state['failed_cells'][row_idx]
-    
-    # Update stats
-    _update_validation_stats()
+        # Update stats
+        _update_validation_stats()
     
     return jsonify({'success': True, 'stats': validation_state['stats']})
 
@@ -315,16 +319,44 @@ def reject_row():
     if row_idx is None:
         return jsonify({'error': 'Missing row_idx'}), 400
     
-    if rejected:
-        validation_state['failed_rows'].add(row_idx)
-    else:
-        validation_state['failed_rows'].discard(row_idx)
-    
-    # Update stats
-    _update_validation_stats()
+    with validation_lock:
+        if rejected:
+            validation_state['failed_rows'].add(row_idx)
+        else:
+            validation_state['failed_rows'].discard(row_idx)
+        
+        # Update stats
+        _update_validation_stats()
     
     return jsonify({'success': True, 'stats': validation_state['stats']})
 
+@app.route('/reject_rows', methods=['POST'])
+def reject_rows():
+    """Mark several rows as rejected (or passed) in one request"""
+    if product_specs_df is None:
+        return jsonify({'error': 'No data loaded'}), 400
+    
+    data = request.get_json(silent=True) or {}
+    row_idxs = data.get('row_idxs')
+    rejected = data.get('rejected', True)
+
+    if not row_idxs or not isinstance(row_idxs, list):
+        return jsonify({'error': 'row_idxs must be a non-empty list'}), 400
+    total_rows = len(product_specs_df)
+    if not all(type(idx) is int and 0 <= idx < total_rows for idx in row_idxs):
+        return jsonify({'error': f'row_idxs must be row indices between 0 and {total_rows - 1}'}), 400
+
+    # One set update and one stats recount for the whole selection
+    with validation_lock:
+        if rejected:
+            validation_state['failed_rows'].update(row_idxs)
+        else:
+            validation_state['failed_rows'].difference_update(row_idxs)
+
+        _update_validation_stats()
+
+    return jsonify({'success': True, 'updated': len(row_idxs), 'stats': validation_state['stats']})
+
 @app.route('/get_validation_stats')
 def get_validation_stats():
     """Get current validation statistics"""
@@ -356,54 +388,46 @@ def export_validation():
         if count > 0:
             summary_data['Validation Summary'].append(f'{field}: {count} failures')
     
-    # Create detailed report
-    detailed_data = []
-    for idx, row in product_specs_df.iterrows():
-        row_failed = idx in validation_state['failed_rows']
-        cell_failures = validation_state['failed_cells'].get(idx, {})
-        
-        detailed_row = {
-            'row_index': idx,
-            'product_url': llm_results_df.iloc[idx].get('product_url', '') if llm_results_df is not None else '',
-            'row_status': 'FAILED' if row_failed else 'PASSED',
-            'failed_cells': ', '.join(cell_failures.keys()) if cell_failures else '',
-            'cell_failure_count': len(cell_failures)
-        }
-        
-        # Add all product spec fields
-        for col in product_specs_df.columns:
-            detailed_row[f'spec_{col}'] = row[col]
-            detailed_row[f'{col}_failed'] = col in cell_failures
-        
-        detailed_data.append(detailed_row)
-    
-    # Create CSV content
-    output = StringIO()
+    # Create detailed report column-wise instead of building a dict per row
+    row_indices = product_specs_df.index
+    failed_rows = validation_state['failed_rows']
+    cell_failures = [validation_state['failed_cells'].get(idx, {}) for idx in row_indices]
     
-    # Write summary section
-    output.write("VALIDATION SUMMARY\n")
-    for line in summary_data['Validation Summary']:
-        output.write(f"{line}\n")
+    if llm_results_df is not None and 'product_url' in llm_results_df.columns:
+        product_urls = llm_results_df['product_url'].tolist()
+    else:
+        product_urls = []
     
-    output.write("\n\nDETAILED RESULTS\n")
+    detailed_columns = {
+        'row_index': row_indices,
+        'product_url': [product_urls[idx] if idx < len(product_urls) else '' for idx in row_indices],
+        'row_status': ['FAILED' if idx in failed_rows else 'PASSED' for idx in row_indices],
+        'failed_cells': [', '.join(cells.keys()) for cells in cell_failures],
+        'cell_failure_count': [len(cells) for cells in cell_failures]
+    }
     
-    # Write detailed results
-    if detailed_data:
-        detailed_df = pd.DataFrame(detailed_data)
-        detailed_df.to_csv(output, index=False)
+    # Add all product spec fields
+    for col in product_specs_df.columns:
+        detailed_columns[f'spec_{col}'] = product_specs_df[col].to_numpy()
+        detailed_columns[f'{col}_failed'] = [col in cells for cells in cell_failures]
     
-    # Prepare file for download
-    output.seek(0)
     filename = f'validation_results_{timestamp}.csv'
     
     # Create output directory if it doesn't exist
     output_dir = 'workspace/output'
     os.makedirs(output_dir, exist_ok=True)
     
-    # Save to output directory
+    # Write summary and detailed results straight to the output file
     file_path = os.path.join(output_dir, filename)
-    with open(file_path, 'w') as f:
-        f.write(output.getvalue())
+    with open(file_path, 'w') as output:
+        output.write("VALIDATION SUMMARY\n")
+        for line in summary_data['Validation Summary']:
+            output.write(f"{line}\n")
+        
+        output.write("\n\nDETAILED RESULTS\n")
+        
+        if len(product_specs_df):
+            pd.DataFrame(detailed_columns).to_csv(output, index=False)
     
     return send_file(file_path, as_attachment=True, download_name=filename, mimetype='text/csv')
 
@@ -1,6 +1,7 @@
 import csv
 import json
 import os
+import threading
 from datetime import datetime
 from flask import Flask, render_template, request, jsonify, send_file
 import pandas as pd
@@ -10,7 +11,11 @@ app = Flask(__name__)
 # Global variables to store data
 data = []
 current_index = 0
-validation_results = []
+# Validations keyed by record_index, so lookups don't scan every result
+validation_results = {}
+# Requests are served on several threads; moving the cursor is a check-then-update,
+# so it holds this lock to keep current_index within the loaded records
+navigation_lock = threading.Lock()
 
 @app.route('/')
 def index():
@@ -38,7 +43,7 @@ def upload_file():
         
         data = df.to_dict('records')
         current_index = 0
-        validation_results = []
+        validation_results = {}
         
         return jsonify({
             'success': True,
@@ -73,44 +78,48 @@ def get_current_record():
 @app.route('/next')
 def next_record():
     global current_index
-    if current_index < len(data) - 1:
-        current_index += 1
-    return jsonify({'current_index': current_index})
+    with navigation_lock:
+        if current_index < len(data) - 1:
+            current_index += 1
+        index = current_index
+    return jsonify({'current_index': index})
 
 @app.route('/previous')
 def previous_record():
     global current_index
-    if current_index > 0:
-        current_index -= 1
-    return jsonify({'current_index': current_index})
+    with navigation_lock:
+        if current_index > 0:
+            current_index -= 1
+        index = current_index
+    return jsonify({'current_index': index})
 
 @app.route('/goto/<int:index>')
 def goto_record(index):
     global current_index
-    if 0 <= index < len(data):
-        current_index = index
-    return jsonify({'current_index': current_index})
+    with navigation_lock:
+        if 0 <= index < len(data):
+            current_index = index
+        index = current_index
+    return jsonify({'current_index': index})
 
 @app.route('/validate', methods=['POST'])
 def validate_record():
     global validation_results, data, current_index
     
-    if current_index >= len(data):
+    # One snapshot of the cursor, so a concurrent move can't split the record
+    # index from the URL saved with it
+    with navigation_lock:
+        record_index = current_index
+    if record_index >= len(data):
         return jsonify({'error': 'No current record'}), 400
     
     validation_data = request.json
     validation_data['timestamp'] = datetime.now().isoformat()
-    validation_data['record_index'] = current_index
-    validation_data['url'] = data[current_index]['url']
+    validation_data['record_index'] = record_index
+    validation_data['url'] = data[record_index]['url']
     
-    # Check if we already have a validation for this record
-    existing_index = next((i for i, v in enumerate(validation_results) 
-                          if v['record_index'] == current_index), None)
-    
-    if existing_index is not None:
-        validation_results[existing_index] = validation_data
-    else:
-        validation_results.append(validation_data)
+    # Replaces any earlier validation for this record
+    validation_results[record_index] = validation_data
     
     return jsonify({'success': True})
 
@@ -119,8 +128,7 @@ def get_validation(record_index):
     global validation_results
     
     # Find validation for this record
-    validation = next((v for v in validation_results 
-                      if v['record_index'] == record_index), None)
+    validation = validation_results.get(record_index)
     
     if validation:
         return jsonify({
@@ -142,8 +150,8 @@ def get_summary():
     total_validated = len(validation_results)
     total_records = len(data)
     
-    valid_count = sum(1 for v in validation_results if v.get('is_valid') == 'valid')
-    invalid_count = sum(1 for v in validation_results if v.get('is_valid') == 'invalid')
+    valid_count = sum(1 for v in validation_results.values() if v.get('is_valid') == 'valid')
+    invalid_count = sum(1 for v in validation_results.values() if v.get('is_valid') == 'invalid')
     
     summary = {
         'total_records': total_records,
@@ -168,7 +176,7 @@ def export_results():
     export_data = []
     
     for i, record in enumerate(data):
-        validation = next((v for v in validation_results if v['record_index'] == i), None)
+        validation = validation_results.get(i)
         
         export_row = {
             'record_index': i,
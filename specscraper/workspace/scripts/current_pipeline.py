@@ -2,36 +2,93 @@ from lib.core.html_processor import HTMLProcessor
 from lib.core.llm import PromptTemplator
 from lib.core.llm import LLMInvocator
 from lib.core.scraping import StealthScraper
+from lib.core.evaluation import ProductExtractionEvaluator
+import json
 import pandas as pd
 from concurrent.futures import ThreadPoolExecutor
 
 
-stealth_scraper = StealthScraper()
-html_processor = HTMLProcessor()
-prompt_templator = PromptTemplator()
-llm_invocator = LLMInvocator()
+# Clients are created by init_tools() from main(), not at import: HTML worker
+# processes re-import this module under the spawn start method
+stealth_scraper = None
+html_processor = None
+prompt_templator = None
+llm_invocator = None
+
+LLM_WORKERS = 5
+HTML_WORKERS = 4
+EVAL_WORKERS = 4
+
+
+def init_tools():
+    """Create the scraping, HTML and LLM clients"""
+    global stealth_scraper, html_processor, prompt_templator, llm_invocator
+    stealth_scraper = StealthScraper()
+    html_processor = HTMLProcessor()
+    prompt_templator = PromptTemplator()
+    llm_invocator = LLMInvocator()
+
+
+def extract_product(success, prompt) -> str:
+    """Invoke the LLM for one prompt and return the validated response as JSON"""
+    default_response = PromptTemplator.ProductExtractionOutput(
+            image_url="",
+            type="",
+            description="",
+            model_no="",
+            product_link="",
+            qty="",
+            key="",
+        )
+
+    if success == True:
+        try:
+            llm_response = llm_invocator.invoke_llm(
+                model_provider="openai",
+                llm_model_name="gpt-4o-mini",
+                prompt=prompt
+            )
+        except Exception as e:
+            print(f"Error invoking LLM: {e}")
+            default_response.description = f"Error invoking LLM: {e}"
+            return default_response.model_dump_json()
+
+        try:
+            default_response = PromptTemplator.ProductExtractionOutput.model_validate_json(llm_response)
+        except Exception as e:
+            print(f"Error validating response: {e}")
+            default_response.description = "Error validating response"
+
+    return default_response.model_dump_json()
 
 
 def main():
+    init_tools()
     df = pd.read_csv("workspace/input/specbook.csv")
     df['id'] = range(1, len(df) + 1)
 
     # STEP 1: Scrape product sites
-    product_scrape_results = []
+    # Scrape each distinct URL once; rows repeating a URL reuse its result
+    product_urls = df['product_url'].to_list()
+    unique_urls = list(dict.fromkeys(product_urls))
     with ThreadPoolExecutor(max_workers=10) as executor:
-        for id, product_search_result in zip(df['id'], executor.map(stealth_scraper.scrape_url, df['product_url'].to_list())):
-            product_scrape_results.append({
-                'id': id,
-                'product_url': product_search_result.url,
-                'success': product_search_result.success,
-                'content_length': len(product_search_result.content) if product_search_result.content else 0,
-                'status_code': product_search_result.status_code,
-                'final_method': product_search_result.final_method,
-                'error_reason': product_search_result.error_reason,
-                'page_issues': product_search_result.page_issues,
-                'html_content': product_search_result.content,
-                'full_result': product_search_result.model_dump_json()
-            })
+        scraped = dict(zip(unique_urls, executor.map(stealth_scraper.scrape_url, unique_urls)))
+
+    product_scrape_results = []
+    for id, product_url in zip(df['id'], product_urls):
+        product_search_result = scraped[product_url]
+        product_scrape_results.append({
+            'id': id,
+            'product_url': product_search_result.url,
+            'success': product_search_result.success,
+            'content_length': len(product_search_result.content) if product_search_result.content else 0,
+            'status_code': product_search_result.status_code,
+            'final_method': product_search_result.final_method,
+            'error_reason': product_search_result.error_reason,
+            'page_issues': product_search_result.page_issues,
+            'html_content': product_search_result.content,
+            'full_result': product_search_result.model_dump_json()
+        })
 
     product_scrape_results_df = pd.DataFrame(product_scrape_results)
     print(product_scrape_results_df.value_counts(['success', 'status_code', 'final_method']))
@@ -43,51 +100,34 @@ def main():
     product_scrape_results_df_success = product_scrape_results_df[product_scrape_results_df['success'] == True]
     product_prompts_df = product_scrape_results_df.copy()
 
-    for id, product_url, html_content in zip(product_scrape_results_df_success['id'], product_scrape_results_df_success['product_url'], product_scrape_results_df_success['html_content']):
-        cleaned_html = html_processor.clean_html(str(html_content))
-        cleaned_html_json = cleaned_html.model_dump_json()
-        prompt = prompt_templator.product_extraction(product_url, cleaned_html_json)
-        
-        # Add fields dynamically using loc
-        product_prompts_df.loc[product_prompts_df['id'] == id, 'cleaned_html'] = cleaned_html_json
-        product_prompts_df.loc[product_prompts_df['id'] == id, 'cleaned_html_len'] = len(cleaned_html_json)
+    cleaned_htmls = html_processor.clean_html_batch(
+        product_scrape_results_df_success['html_content'].astype(str).to_list(), max_workers=HTML_WORKERS
+    )
+
+    cleaned_html_jsons = [cleaned_html.model_dump_json() for cleaned_html in cleaned_htmls]
+    prompts = [
+        prompt_templator.product_extraction(product_url, cleaned_html_json)
+        for product_url, cleaned_html_json in zip(product_scrape_results_df_success['product_url'], cleaned_html_jsons)
+    ]
 
-        product_prompts_df.loc[product_prompts_df['id'] == id, 'prompt'] = prompt
-        product_prompts_df.loc[product_prompts_df['id'] == id, 'prompt_len'] = len(prompt)
+    # Successful rows keep their labels in the copied frame, so write each column
+    # once by index instead of masking the id column per row and field
+    success_rows = product_scrape_results_df_success.index
+    product_prompts_df.loc[success_rows, 'cleaned_html'] = cleaned_html_jsons
+    product_prompts_df.loc[success_rows, 'cleaned_html_len'] = [len(j) for j in cleaned_html_jsons]
+    product_prompts_df.loc[success_rows, 'prompt'] = prompts
+    product_prompts_df.loc[success_rows, 'prompt_len'] = [len(prompt) for prompt in prompts]
 
     # STEP 3: Invoke LLM
     llm_results_df = product_prompts_df.copy()
     llm_results_df['prompt_len'].sum()
 
-    for id, success, prompt in zip(llm_results_df['id'], llm_results_df['success'], llm_results_df['prompt']):
-        default_response = PromptTemplator.ProductExtractionOutput(
-                image_url="",
-                type="",
-                description="",
-                model_no="",
-                product_link="",
-                qty="",
-                key="",
-            )
-
-        if success == True:
-            try:
-                llm_response = llm_invocator.invoke_llm(
-                    model_provider="openai",
-                    llm_model_name="gpt-4o-mini",
-                    prompt=prompt
-                )
-            except Exception as e:
-                print(f"Error invoking LLM: {e}")
-                default_response.description = f"Error invoking LLM: {e}"
-
-            try:
-                default_response = PromptTemplator.ProductExtractionOutput.model_validate_json(llm_response)
-            except Exception as e:
-                print(f"Error validating response: {e}")
-                default_response.description = "Error validating response"
-
-        llm_results_df.loc[llm_results_df['id'] == id, 'llm_response'] = default_response.model_dump_json()
+    # LLM calls are network-bound, so overlap their round trips; the shared
+    # rate limiter still paces requests across workers
+    with ThreadPoolExecutor(max_workers=LLM_WORKERS) as executor:
+        llm_results_df['llm_response'] = list(executor.map(
+            extract_product, llm_results_df['success'], llm_results_df['prompt']
+        ))
 
     # STEP 4: Save results
     print(llm_results_df.count())
@@ -97,11 +137,18 @@ def main():
     print(f"Total prompt length: {total_prompt_len:,}")
 
 
-    llm_result_dicts = [dict(PromptTemplator.ProductExtractionOutput.model_validate_json(response)) for response in llm_results_df['llm_response'].to_list()]
+    # Written by model_dump_json above, so it needs no re-validation
+    llm_result_dicts = [json.loads(response) for response in llm_results_df['llm_response'].to_list()]
     product_specs_df = pd.DataFrame(llm_result_dicts)
 
     product_specs_df.to_csv("workspace/output/product_specs.csv", index=False)
 
+    # STEP 5: Score extraction quality; scoring is CPU-bound, so large runs use processes
+    evaluator = ProductExtractionEvaluator()
+    evaluator.evaluate_batch(
+        list(zip(llm_results_df['llm_response'], llm_results_df['product_url'])), max_workers=EVAL_WORKERS
+    )
+
 
 if __name__ == "__main__":
     main()
@@ -6,13 +6,13 @@ from pathlib import Path
 sys.path.append(str(Path(__file__).resolve().parent.parent.parent))
 
 from lib.core import HTMLProcessor, PromptTemplator, LLMInvocator, StealthScraper
+from lib.core.scraping import ScrapingMethod
 from lib.monitoring import PipelineMonitor
 from lib.monitoring.models import PipelineStage, MetricType, ErrorCategory
 from lib.benchmarking import CacheManager
 import pandas as pd
-from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
 import logging
-import time
 import argparse
 
 # Configure logging
@@ -23,13 +23,34 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
-# Initialize tools
-stealth_scraper = StealthScraper()
-html_processor = HTMLProcessor()
-prompt_templator = PromptTemplator()
-llm_invocator = LLMInvocator()
-monitor = PipelineMonitor()
-cache_manager = CacheManager()
+# Tools are created by init_tools() when the pipeline runs, not at import: HTML
+# worker processes re-import this module under the spawn start method
+stealth_scraper = None
+html_processor = None
+prompt_templator = None
+llm_invocator = None
+monitor = None
+cache_manager = None
+
+# HTML parsing is CPU-bound, so it runs in worker processes
+HTML_WORKERS = 4
+
+# Concurrent LLM calls; the rate limiter still paces them against the model's limits
+LLM_WORKERS = 5
+
+# Newly scraped pages buffered before they are written to the cache in one batch
+CACHE_FLUSH_SIZE = 50
+
+
+def init_tools():
+    """Create the scraping, LLM, monitoring and cache clients"""
+    global stealth_scraper, html_processor, prompt_templator, llm_invocator, monitor, cache_manager
+    stealth_scraper = StealthScraper()
+    html_processor = HTMLProcessor()
+    prompt_templator = PromptTemplator()
+    llm_invocator = LLMInvocator()
+    monitor = PipelineMonitor()
+    cache_manager = CacheManager()
 
 
 def estimate_llm_cost(model: str, prompt_len: int, response_len: int = 1000) -> float:
@@ -60,14 +81,16 @@ def main(input_file: str = "workspace/input/specbook.csv",
          model_name: str = "gpt-4o-mini",
          use_cache: bool = True):
     """Main pipeline execution with monitoring"""
+    init_tools()
     
     # Load input data
     logger.info(f"Loading URLs from {input_file}")
     df = pd.read_csv(input_file)
     df['id'] = range(1, len(df) + 1)
     
-    # Start monitoring
-    execution_id = monitor.start_execution(total_urls=len(df))
+    # Start monitoring; scrapes are recorded once per distinct URL, so progress
+    # counts distinct URLs rather than input rows
+    execution_id = monitor.start_execution(total_urls=df['product_url'].nunique())
     logger.info(f"Started pipeline execution: {execution_id}")
     
     try:
@@ -101,37 +124,70 @@ def main(input_file: str = "workspace/input/specbook.csv",
             
             # Cache miss - perform actual scraping
             logger.info(f"{'Cache miss for ' + url + ', scraping...' if use_cache else 'Scraping ' + url + '...'}")
-            scrape_result = stealth_scraper.scrape_url(url)
-            
-            # Store successful results in cache
-            if scrape_result.success and scrape_result.content and use_cache:
-                cache_manager.store_html(url, scrape_result.content, {
-                    'scrape_method': scrape_result.final_method.value,
-                    'status_code': scrape_result.status_code,
-                    'scrape_time': scrape_result.scrape_time
-                })
-                logger.info(f"Cached result for {url}")
-            
-            return scrape_result
+            return stealth_scraper.scrape_url(url)
         
-        # Use cache-aware scraping
-        with ThreadPoolExecutor(max_workers=10) as executor:
-            for id, product_search_result in zip(df['id'], executor.map(scrape_with_cache, df['product_url'].to_list())):
-                # Record scraping metrics
-                monitor.record_scrape_result(product_search_result, stage=PipelineStage.SCRAPING)
+        # Use cache-aware scraping, once per distinct URL; repeated rows reuse the result
+        product_urls = df['product_url'].to_list()
+        unique_urls = list(dict.fromkeys(product_urls))
+        scraped = {}
+        # Pages are handed to the HTML workers as each scrape completes, so parsing
+        # overlaps the slowest scrapes instead of waiting for all of them
+        cleaning = {}
+        # Freshly scraped pages, written to the cache in batches as scrapes complete
+        new_cache_entries = []
+        cached_count = 0
+        
+        def flush_cache_entries():
+            """Write buffered scraped pages to the cache in one batch"""
+            nonlocal new_cache_entries, cached_count
+            if new_cache_entries:
+                entries, new_cache_entries = new_cache_entries, []
+                cached_count += cache_manager.store_html_batch(entries)
+        
+        try:
+            with ThreadPoolExecutor(max_workers=10) as executor, \
+                    ProcessPoolExecutor(max_workers=HTML_WORKERS) as html_executor:
+                future_to_url = {executor.submit(scrape_with_cache, url): url for url in unique_urls}
+                for future in as_completed(future_to_url):
+                    url = future_to_url[future]
+                    product_search_result = future.result()
+                    scraped[url] = product_search_result
                 
-                product_scrape_results.append({
-                    'id': id,
-                    'product_url': product_search_result.url,
-                    'success': product_search_result.success,
-                    'content_length': len(product_search_result.content) if product_search_result.content else 0,
-                    'status_code': product_search_result.status_code,
-                    'final_method': product_search_result.final_method,
-                    'error_reason': product_search_result.error_reason,
-                    'page_issues': product_search_result.page_issues,
-                    'html_content': product_search_result.content,
-                    'full_result': product_search_result.model_dump_json()
-                })
+                    # Record scraping metrics for the scrapes actually performed
+                    monitor.record_scrape_result(product_search_result, stage=PipelineStage.SCRAPING)
+                
+                    if product_search_result.success:
+                        cleaning[url] = html_executor.submit(HTMLProcessor.clean_html_json_timed, str(product_search_result.content))
+                
+                    if (use_cache and product_search_result.success and product_search_result.content
+                            and product_search_result.final_method != ScrapingMethod.CACHED):
+                        new_cache_entries.append((url, product_search_result.content, {
+                            'scrape_method': product_search_result.final_method.value,
+                            'status_code': product_search_result.status_code,
+                            'scrape_time': product_search_result.scrape_time
+                        }))
+                        if len(new_cache_entries) >= CACHE_FLUSH_SIZE:
+                            flush_cache_entries()
+        finally:
+            # Keep pages already scraped even if a scrape raises
+            flush_cache_entries()
+        if cached_count:
+            logger.info(f"Cached {cached_count} newly scraped pages")
+        
+        for id, product_url in zip(df['id'], product_urls):
+            product_search_result = scraped[product_url]
+            product_scrape_results.append({
+                'id': id,
+                'product_url': product_search_result.url,
+                'success': product_search_result.success,
+                'content_length': len(product_search_result.content) if product_search_result.content else 0,
+                'status_code': product_search_result.status_code,
+                'final_method': product_search_result.final_method,
+                'error_reason': product_search_result.error_reason,
+                'page_issues': product_search_result.page_issues,
+                'html_content': product_search_result.content,
+                'full_result': product_search_result.model_dump_json()
+            })
 
         product_scrape_results_df = pd.DataFrame(product_scrape_results)
         
@@ -149,21 +205,18 @@ def main(input_file: str = "workspace/input/specbook.csv",
         product_scrape_results_df_success = product_scrape_results_df[product_scrape_results_df['success'] == True]
         product_prompts_df = product_scrape_results_df.copy()
 
-        for id, product_url, html_content in zip(
-            product_scrape_results_df_success['id'], 
-            product_scrape_results_df_success['product_url'], 
-            product_scrape_results_df_success['html_content']
+        # Results keyed by row label, written back once per column after the loop
+        processed_rows = {}
+        for row, product_url in zip(
+            product_scrape_results_df_success.index, 
+            product_scrape_results_df_success['product_url']
         ):
             try:
-                # Record HTML processing start
-                start_time = time.time()
-                
-                cleaned_html = html_processor.clean_html(str(html_content))
-                cleaned_html_json = cleaned_html.model_dump_json()
+                # Parsed by the HTML workers during step 1
+                cleaned_html_json, processing_time = cleaning[product_url].result()
                 prompt = prompt_templator.product_extraction(product_url, cleaned_html_json)
                 
                 # Record processing time
-                processing_time = time.time() - start_time
                 monitor.record_metric(
                     name="html_processing.duration_seconds",
                     value=processing_time,
@@ -171,11 +224,7 @@ def main(input_file: str = "workspace/input/specbook.csv",
                     stage=PipelineStage.HTML_PROCESSING
                 )
                 
-                # Add fields dynamically using loc
-                product_prompts_df.loc[product_prompts_df['id'] == id, 'cleaned_html'] = cleaned_html_json
-                product_prompts_df.loc[product_prompts_df['id'] == id, 'cleaned_html_len'] = len(cleaned_html_json)
-                product_prompts_df.loc[product_prompts_df['id'] == id, 'prompt'] = prompt
-                product_prompts_df.loc[product_prompts_df['id'] == id, 'prompt_len'] = len(prompt)
+                processed_rows[row] = (cleaned_html_json, len(cleaned_html_json), prompt, len(prompt))
                 
             except Exception as e:
                 logger.error(f"Error processing HTML for URL {product_url}: {e}")
@@ -186,67 +235,98 @@ def main(input_file: str = "workspace/input/specbook.csv",
                     error_message=str(e)
                 )
 
+        # Add fields by row label instead of masking the id column per row and field
+        product_prompts_df = product_prompts_df.join(pd.DataFrame.from_dict(
+            processed_rows, orient='index',
+            columns=['cleaned_html', 'cleaned_html_len', 'prompt', 'prompt_len']
+        ))
+
         # STEP 3: Invoke LLM
         logger.info(f"Starting LLM extraction with model {model_name}...")
         llm_results_df = product_prompts_df.copy()
         total_prompt_tokens = llm_results_df['prompt_len'].sum() // 4  # Rough estimate
 
-        for id, success, prompt in zip(llm_results_df['id'], llm_results_df['success'], llm_results_df['prompt']):
-            default_response = PromptTemplator.ProductExtractionOutput(
-                    image_url="",
-                    type="",
-                    description="",
-                    model_no="",
-                    product_link="",
-                )
+        def invoke_for_prompt(prompt):
+            """Invoke the LLM for one prompt, returning the response or the error raised"""
+            try:
+                return llm_invocator.invoke_llm(
+                    model_provider="openai",
+                    llm_model_name=model_name,
+                    prompt=prompt
+                ), None
+            except Exception as e:
+                return None, e
 
-            if success == True and pd.notna(prompt):
-                try:
-                    start_time = time.time()
-                    
-                    llm_response = llm_invocator.invoke_llm(
-                        model_provider="openai",
-                        llm_model_name=model_name,
-                        prompt=prompt
+        prompts = llm_results_df['prompt'].to_list()
+        needs_llm = [
+            success == True and pd.notna(prompt)
+            for success, prompt in zip(llm_results_df['success'], prompts)
+        ]
+
+        llm_responses = []
+        # Plain-dict copies of each response for step 4, so the JSON written for
+        # the CSV isn't parsed back again
+        llm_records = []
+        # Calls run on a bounded pool; responses are handled here in row order,
+        # so metrics are recorded from a single thread
+        with ThreadPoolExecutor(max_workers=LLM_WORKERS) as executor:
+            llm_calls = executor.map(
+                invoke_for_prompt, [prompt for prompt, needed in zip(prompts, needs_llm) if needed]
+            )
+            for row, needed, prompt in zip(llm_results_df.index, needs_llm, prompts):
+                default_response = PromptTemplator.ProductExtractionOutput(
+                        image_url="",
+                        type="",
+                        description="",
+                        model_no="",
+                        product_link="",
                     )
+
+                if needed:
+                    try:
+                        llm_response, llm_error = next(llm_calls)
+                        if llm_error is not None:
+                            raise llm_error
+                        
+                        # Calculate cost and record metrics
+                        prompt_len = len(prompt) if prompt else 0
+                        estimated_cost = estimate_llm_cost(model_name, prompt_len)
                     
-                    # Calculate cost and record metrics
-                    llm_time = time.time() - start_time
-                    prompt_len = len(prompt) if prompt else 0
-                    estimated_cost = estimate_llm_cost(model_name, prompt_len)
-                    
-                    # Get actual token usage if available
-                    usage_stats = llm_invocator.get_usage_stats(model_name)
-                    actual_tokens = usage_stats.get('tokens_used_minute', 0) if usage_stats else 0
+                        # Get actual token usage if available
+                        usage_stats = llm_invocator.get_usage_stats(model_name)
+                        actual_tokens = usage_stats.get('tokens_used_minute', 0) if usage_stats else 0
                     
-                    monitor.record_llm_result(
-                        success=True,
-                        model=model_name,
-                        tokens_used=actual_tokens,
-                        cost=estimated_cost
-                    )
+                        monitor.record_llm_result(
+                            success=True,
+                            model=model_name,
+                            tokens_used=actual_tokens,
+                            cost=estimated_cost
+                        )
                     
-                    # Validate response
-                    default_response = PromptTemplator.ProductExtractionOutput.model_validate_json(llm_response)
+                        # Validate response
+                        default_response = PromptTemplator.ProductExtractionOutput.model_validate_json(llm_response)
                     
-                except Exception as e:
-                    error_msg = f"Error invoking LLM: {e}"
-                    logger.error(error_msg)
-                    default_response.description = error_msg
+                    except Exception as e:
+                        error_msg = f"Error invoking LLM: {e}"
+                        logger.error(error_msg)
+                        default_response.description = error_msg
                     
-                    monitor.record_llm_result(
-                        success=False,
-                        model=model_name,
-                        error=str(e)
-                    )
-            else:
-                # For failed scrapes, populate description with error details
-                row_data = llm_results_df[llm_results_df['id'] == id].iloc[0]
-                status_code = row_data.get('status_code', 'Unknown')
-                error_reason = row_data.get('error_reason', 'Unknown error')
-                default_response.description = f"FETCH_FAILED: Status {status_code} - {error_reason}"
+                        monitor.record_llm_result(
+                            success=False,
+                            model=model_name,
+                            error=str(e)
+                        )
+                else:
+                    # For failed scrapes, populate description with error details
+                    row_data = llm_results_df.loc[row]
+                    status_code = row_data.get('status_code', 'Unknown')
+                    error_reason = row_data.get('error_reason', 'Unknown error')
+                    default_response.description = f"FETCH_FAILED: Status {status_code} - {error_reason}"
+
+                llm_responses.append(default_response.model_dump_json())
+                llm_records.append(default_response.model_dump())
 
-            llm_results_df.loc[llm_results_df['id'] == id, 'llm_response'] = default_response.model_dump_json()
+        llm_results_df['llm_response'] = llm_responses
 
         # STEP 4: Save results
         logger.info("Saving results...")
@@ -260,9 +340,7 @@ def main(input_file: str = "workspace/input/specbook.csv",
         successful_results = []
         failed_results = []
 
-        for i, (response, success) in enumerate(zip(llm_results_df['llm_response'], llm_results_df['success'])):
-            result_dict = dict(PromptTemplator.ProductExtractionOutput.model_validate_json(response))
-            
+        for result_dict, success in zip(llm_records, llm_results_df['success']):
             if success:
                 # Include all fields for successful extractions
                 successful_results.append(result_dict)
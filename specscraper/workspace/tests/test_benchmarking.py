@@ -2,6 +2,7 @@
 import pytest
 import tempfile
 import json
+import re
 from datetime import datetime
 from pathlib import Path
 from unittest.mock import Mock, patch
@@ -118,6 +119,227 @@ class TestCacheManager:
         # Check that content can still be retrieved
         retrieved = self.cache_manager.get_cached_html(url)
         assert retrieved == html_content
+    
+    def test_memory_cache_is_bounded_lru(self):
+        """Test memory cache evicts least recently used entries"""
+        cache_manager = CacheManager(cache_dir=self.temp_dir, memory_cache_size=2)
+        cache_manager.store_html("https://example.com/1", "<html>1</html>")
+        cache_manager.store_html("https://example.com/2", "<html>2</html>")
+        
+        # Touch the first entry so the second becomes least recently used
+        cache_manager.get_cached_html("https://example.com/1")
+        cache_manager.store_html("https://example.com/3", "<html>3</html>")
+        
+        assert list(cache_manager._memory_cache) == ["https://example.com/1", "https://example.com/3"]
+        
+        # Evicted entries are still served from disk
+        assert cache_manager.get_cached_html("https://example.com/2") == "<html>2</html>"
+
+    def test_batch_cached_paths_defer_file_reads(self):
+        """Test batch path lookups find cached files without reading them"""
+        self.cache_manager.store_html("https://example.com/a", "<html>A</html>")
+        self.cache_manager.clear_memory_cache()
+        
+        paths = self.cache_manager.get_batch_cached_paths(["https://example.com/a", "https://example.com/missing"])
+        
+        assert list(paths) == ["https://example.com/a"]
+        assert not self.cache_manager._memory_cache
+        assert self.cache_manager.read_cached_file("https://example.com/a", paths["https://example.com/a"]) == "<html>A</html>"
+        assert self.cache_manager.read_cached_file("https://example.com/b", "/nonexistent/b.html") is None
+
+    def test_memory_cache_shared_across_threads(self):
+        """Test concurrent hits and evictions on a small memory cache stay consistent"""
+        from concurrent.futures import ThreadPoolExecutor
+
+        cache_manager = CacheManager(cache_dir=self.temp_dir, memory_cache_size=3)
+        urls = [f"https://example.com/{i}" for i in range(8)]
+        for url in urls:
+            cache_manager.store_html(url, f"<html>{url}</html>")
+
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            results = list(executor.map(cache_manager.get_cached_html, urls * 50))
+
+        assert results == [f"<html>{url}</html>" for url in urls * 50]
+        assert len(cache_manager._memory_cache) == 3
+
+    def test_cache_stats_reused_until_entries_change(self):
+        """Test stats are served from the TTL cache and recomputed after a store"""
+        self.cache_manager.store_html("https://example.com/a", "<html>A</html>")
+        assert self.cache_manager.get_cache_stats()["total_entries"] == 1
+        
+        with patch.object(self.cache_manager, '_compute_cache_stats') as compute:
+            self.cache_manager.get_cache_stats()
+            compute.assert_not_called()
+        
+        self.cache_manager.store_html("https://example.com/b", "<html>B</html>")
+        assert self.cache_manager.get_cache_stats()["total_entries"] == 2
+
+    def test_store_during_stats_recompute_is_not_lost(self):
+        """Test a store racing an in-flight recompute leaves no stale stats cached"""
+        import threading
+        import time
+
+        compute = self.cache_manager._compute_cache_stats
+        writers = []
+
+        def compute_then_store():
+            # The recompute has read an empty table when another thread stores an entry
+            stats = compute()
+            writer = threading.Thread(
+                target=self.cache_manager.store_html, args=("https://example.com/a", "<html>A</html>")
+            )
+            writer.start()
+            writers.append(writer)
+            time.sleep(0.1)
+            return stats
+
+        with patch.object(self.cache_manager, '_compute_cache_stats', side_effect=compute_then_store):
+            assert self.cache_manager.get_cache_stats()["total_entries"] == 0
+        writers[0].join()
+
+        assert self.cache_manager.get_cache_stats()["total_entries"] == 1
+
+    def test_manifest_pages_cover_every_entry(self):
+        """Test keyset pages of the manifest return each entry once, newest first"""
+        urls = [f"https://example.com/{i}" for i in range(12)]
+        self.cache_manager.store_html_batch([(url, f"<html>{url}</html>", None) for url in urls])
+        
+        pages = list(self.cache_manager._iter_manifest_pages(page_size=5))
+        
+        assert [len(page) for page in pages] == [5, 5, 2]
+        rows = [row for page in pages for row in page]
+        assert sorted(row[0] for row in rows) == sorted(urls)
+        created = [row[5] for row in rows]
+        assert created == sorted(created, reverse=True)
+
+    def test_manifest_pages_include_undated_entries(self):
+        """Test entries without created_at are exported once each, after dated ones"""
+        urls = [f"https://example.com/{i}" for i in range(12)]
+        self.cache_manager.store_html_batch([(url, f"<html>{url}</html>", None) for url in urls])
+        undated = urls[3:9]
+        conn = self.cache_manager._connect()
+        conn.executemany("UPDATE cache_entries SET created_at = NULL WHERE url = ?",
+                         [(url,) for url in undated])
+        conn.commit()
+
+        pages = list(self.cache_manager._iter_manifest_pages(page_size=5))
+        rows = [row for page in pages for row in page]
+
+        assert sorted(row[0] for row in rows) == sorted(urls)
+        assert [row[5] is None for row in rows] == [False] * 6 + [True] * 6
+        assert {row[0] for row in rows[6:]} == set(undated)
+
+    def test_import_from_llm_results_in_chunks(self):
+        """Test llm_results.csv is imported chunk by chunk, skipping failures and repeats"""
+        import pandas as pd
+        
+        llm_results_path = Path(self.temp_dir) / "llm_results.csv"
+        pd.DataFrame({
+            "product_url": ["https://example.com/a", "https://example.com/b", "https://example.com/a",
+                            "https://example.com/c", "https://example.com/d"],
+            "success": [True, False, True, True, True],
+            "html_content": ["<html>A</html>", "<html>B</html>", "<html>A2</html>", "", "<html>D</html>"],
+            "final_method": ["requests"] * 5,
+            "status_code": [200] * 5,
+            "prompt": ["unused"] * 5,
+        }).to_csv(llm_results_path, index=False)
+        cache_manager = CacheManager(cache_dir=self.temp_dir, llm_results_path=str(llm_results_path))
+        
+        assert cache_manager.import_from_llm_results(chunk_rows=2) == 2
+        assert cache_manager.get_cached_html("https://example.com/a") == "<html>A</html>"
+        assert not cache_manager.has_cached("https://example.com/b")
+        assert cache_manager.import_from_llm_results(chunk_rows=2) == 0
+        
+        # Forcing re-imports every row, so the last row for a URL wins
+        assert cache_manager.import_from_llm_results(force=True, chunk_rows=2) == 3
+        cache_manager.clear_memory_cache()
+        assert cache_manager.get_cached_html("https://example.com/a") == "<html>A2</html>"
+
+    def test_import_retries_url_after_failed_store(self):
+        """Test a URL whose store fails is not treated as cached by later rows"""
+        import pandas as pd
+        
+        llm_results_path = Path(self.temp_dir) / "llm_results.csv"
+        pd.DataFrame({
+            "product_url": ["https://example.com/a", "https://example.com/a"],
+            "success": [True, True],
+            "html_content": ["<html>A</html>", "<html>A2</html>"],
+        }).to_csv(llm_results_path, index=False)
+        cache_manager = CacheManager(cache_dir=self.temp_dir, llm_results_path=str(llm_results_path))
+        
+        write_html = cache_manager._write_html
+        with patch.object(cache_manager, '_write_html',
+                          side_effect=[OSError("disk full"), write_html]) as write:
+            assert cache_manager.import_from_llm_results(chunk_rows=1) == 1
+            assert write.call_count == 2
+        assert cache_manager.get_cached_html("https://example.com/a") == "<html>A2</html>"
+
+    def test_database_uses_wal_journal(self):
+        """Test the cache database is opened in WAL mode for concurrent readers"""
+        conn = self.cache_manager._connect()
+        assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+
+    def test_access_stats_are_buffered(self):
+        """Test cache hits are batched before being written to the database"""
+        url = "https://example.com/product"
+        self.cache_manager.store_html(url, "<html>Test</html>")
+        self.cache_manager.get_cached_html(url)
+        self.cache_manager.get_cached_html(url)
+        
+        assert self.cache_manager._pending_access[url][0] == 2
+        
+        stats = self.cache_manager.get_cache_stats()
+        assert stats["most_accessed"] == [{"url": url, "count": 2}]
+        assert not self.cache_manager._pending_access
+        
+        # Buffered hits are stamped in the same layout SQLite uses for created_at
+        conn = self.cache_manager._connect()
+        created_at, last_accessed = conn.execute(
+            "SELECT created_at, last_accessed FROM cache_entries WHERE url = ?", (url,)
+        ).fetchone()
+        assert re.fullmatch(r"\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}\.\d{3}", created_at)
+        assert re.fullmatch(r"\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}\.\d{3}", last_accessed)
+        assert last_accessed >= created_at
+    
+    def test_cleanup_old_entries(self):
+        """Test expired entries are removed from disk, database and memory"""
+        url = "https://example.com/product"
+        self.cache_manager.store_html(url, "<html>Test</html>")
+        
+        assert self.cache_manager.cleanup_old_entries(days=30) == 0
+        
+        # A negative age puts the cutoff in the future, expiring everything
+        assert self.cache_manager.cleanup_old_entries(days=-1) == 1
+        assert not self.cache_manager.has_cached(url)
+        assert not (Path(self.temp_dir) / f"{self.cache_manager.get_cache_key(url)}.html").exists()
+    
+    def test_compressed_html_storage(self):
+        """Test large pages are stored gzip-compressed and read back intact"""
+        cache_manager = CacheManager(cache_dir=self.temp_dir, compress_html=True)
+        url = "https://example.com/product"
+        html_content = "<html><body>" + "<p>Product details</p>" * 100 + "</body></html>"
+        
+        assert cache_manager.store_html(url, html_content)
+        cache_key = cache_manager.get_cache_key(url)
+        assert (Path(self.temp_dir) / f"{cache_key}.html.gz").exists()
+        
+        cache_manager.clear_memory_cache()
+        assert cache_manager.get_cached_html(url) == html_content
+        assert cache_manager.get_batch_cached_html([url])[url] == html_content
+    
+    def test_store_html_batch(self):
+        """Test several pages are stored with one call and read back with metadata"""
+        entries = [
+            ("https://example.com/a", "<html>A</html>", {"scrape_method": "requests"}),
+            ("https://example.com/b", "<html>B</html>", None),
+        ]
+        
+        assert self.cache_manager.store_html_batch(entries) == 2
+        
+        self.cache_manager.clear_memory_cache()
+        cached = self.cache_manager.get_batch_cached_html(["https://example.com/a", "https://example.com/b"])
+        assert cached == {"https://example.com/a": "<html>A</html>", "https://example.com/b": "<html>B</html>"}
+        assert self.cache_manager.get_cache_stats()["total_entries"] == 2
 
 
 class TestExperimentModels:
@@ -365,6 +587,103 @@ class TestReportGenerator:
 
 
 # Integration tests
+class TestExperimentRunner:
+    """Test URL fetching and result streaming in ExperimentRunner"""
+    
+    def setup_method(self):
+        """Create a runner with a temporary cache and no LLM client"""
+        from lib.benchmarking import ExperimentRunner
+        from lib.monitoring import PipelineMonitor
+        
+        self.temp_dir = tempfile.mkdtemp()
+        self.cache_manager = CacheManager(cache_dir=self.temp_dir)
+        with patch('lib.benchmarking.experiment_runner.LLMInvocator'):
+            self.runner = ExperimentRunner(
+                cache_manager=self.cache_manager,
+                monitor=PipelineMonitor(metrics_dir=self.temp_dir),
+                output_dir=self.temp_dir
+            )
+    
+    def scrape_result(self, url: str):
+        """Build a successful scrape of url"""
+        from lib.core.scraping import ScrapeResult, ScrapingMethod
+        
+        return ScrapeResult(
+            url=url, final_url=url, success=True, content=f"<html>{url}</html>",
+            status_code=200, final_method=ScrapingMethod.REQUESTS,
+            methods_tried={ScrapingMethod.REQUESTS}, error_reason="", page_issues=[],
+            scrape_time=0.0, attempts=1, warnings=[]
+        )
+    
+    def test_closing_results_early_flushes_scraped_pages(self):
+        """Test pages scraped before the consumer stops are still written to the cache"""
+        urls = [f"https://example.com/{i}" for i in range(6)]
+        
+        def process(url, config, use_cache, cached_path):
+            return self.runner._get_html(url, use_cache)
+        
+        with patch.object(self.runner.scraper, 'scrape_url', side_effect=self.scrape_result), \
+                patch.object(self.runner, '_process_single_url', side_effect=process):
+            results = self.runner.iter_results(Mock(), urls, use_cache=True, max_workers=2)
+            first = next(results)
+            results.close()
+        
+        assert first in {f"<html>{url}</html>" for url in urls}
+        assert not self.runner._scraped_html
+        self.cache_manager.clear_memory_cache()
+        assert all(self.cache_manager.get_cached_html(url) == f"<html>{url}</html>" for url in urls)
+    
+    def fetch_concurrently(self, fetch, callers: int = 5):
+        """Call _get_html for one URL from several threads while the first fetch is held open"""
+        import threading
+        import time
+        from concurrent.futures import ThreadPoolExecutor
+        
+        release = threading.Event()
+        calls = []
+        
+        def held_fetch(url, use_cache):
+            calls.append(url)
+            assert release.wait(5)
+            return fetch(url)
+        
+        def get_html():
+            try:
+                return self.runner._get_html("https://example.com/a", False)
+            except Exception as e:
+                return e
+        
+        with patch.object(self.runner, '_fetch_html', side_effect=held_fetch), \
+                ThreadPoolExecutor(max_workers=callers) as executor:
+            futures = [executor.submit(get_html) for _ in range(callers)]
+            # Give every caller time to find the fetch in flight before it finishes
+            time.sleep(0.2)
+            release.set()
+            outcomes = [future.result() for future in futures]
+        
+        assert not self.runner._inflight_html
+        return calls, outcomes
+    
+    def test_concurrent_fetches_of_a_url_share_one_fetch(self):
+        """Test concurrent callers for the same URL wait on a single fetch"""
+        calls, outcomes = self.fetch_concurrently(lambda url: f"<html>{url}</html>")
+        
+        assert calls == ["https://example.com/a"]
+        assert outcomes == ["<html>https://example.com/a</html>"] * 5
+    
+    def test_concurrent_fetch_failure_reaches_every_caller(self):
+        """Test a failed shared fetch raises in every waiting caller"""
+        error = RuntimeError("scrape failed")
+        
+        def fail(url):
+            raise error
+        
+        calls, outcomes = self.fetch_concurrently(fail)
+        
+        assert calls == ["https://example.com/a"]
+        assert outcomes == [error] * 5
+
+
 class TestBenchmarkingIntegration:
     """Integration tests for benchmarking components"""
     
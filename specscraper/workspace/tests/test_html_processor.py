@@ -0,0 +1,46 @@
+"""Tests for HTML processing"""
+import pytest
+from pathlib import Path
+from unittest.mock import patch
+import sys
+
+# Add project root to path
+sys.path.append(str(Path(__file__).resolve().parent.parent.parent))
+
+from lib.core.html_processor import HTMLProcessor
+
+PAGES = [
+    """<html><head><title> Oak Chair </title><meta name="description" content="Solid oak">
+    </head><body><nav>Menu</nav><h1>Oak Chair</h1><img src="/chair.jpg" alt=" Chair "></body></html>""",
+    """<html><head><meta property="og:title" content="Lamp"></head>
+    <body><script>var x = 1;</script><p>Brass lamp</p><img src="/lamp.jpg"></body></html>""",
+    "<p>No head at all</p>",
+]
+
+
+class TestCleanHtmlBatch:
+    """Test batch HTML cleaning"""
+
+    @pytest.mark.parametrize("max_workers", [None, 2])
+    def test_batch_matches_clean_html_per_position(self, max_workers):
+        """Test duplicates and distinct pages come back in input order, as clean_html parses them"""
+        raw_htmls = [PAGES[0], PAGES[1], PAGES[0], PAGES[2], PAGES[1], PAGES[0]]
+
+        cleaned = HTMLProcessor.clean_html_batch(raw_htmls, max_workers=max_workers)
+
+        assert [c.model_dump() for c in cleaned] == [HTMLProcessor.clean_html(h).model_dump() for h in raw_htmls]
+
+    def test_duplicates_are_parsed_once(self):
+        """Test each distinct document is parsed a single time"""
+        raw_htmls = [PAGES[0], PAGES[1], PAGES[0], PAGES[0]]
+
+        with patch.object(HTMLProcessor, "clean_html", wraps=HTMLProcessor.clean_html) as clean_html:
+            cleaned = HTMLProcessor.clean_html_batch(raw_htmls)
+
+        assert clean_html.call_count == 2
+        assert cleaned[0] is cleaned[2] is cleaned[3]
+
+    def test_empty_batch(self):
+        """Test an empty batch returns no results with or without workers"""
+        assert HTMLProcessor.clean_html_batch([]) == []
+        assert HTMLProcessor.clean_html_batch([], max_workers=2) == []
@@ -1,14 +1,17 @@
 """Tests for monitoring functionality"""
+import json
 import pytest
 import tempfile
 from datetime import datetime
 from pathlib import Path
+from unittest.mock import patch
 import sys
 
 # Add project root to path
 sys.path.append(str(Path(__file__).resolve().parent.parent.parent.parent.parent))
 
 from lib.monitoring import PipelineMonitor, MetricsCollector, ErrorAnalyzer
+from lib.monitoring import metrics_collector
 from lib.monitoring.models import (
     PipelineMetric, PipelineError, PipelineExecution,
     MetricType, ErrorCategory, PipelineStage
@@ -241,6 +244,32 @@ class TestMetricsCollector:
         assert "Error Breakdown" in report
         assert "Cost Analysis" in report
 
+    @pytest.mark.parametrize("use_orjson", [True, False])
+    def test_save_aggregated_metrics_compact(self, use_orjson):
+        """Test compact JSON is identical whether written by orjson or the json module"""
+        if use_orjson:
+            pytest.importorskip("orjson")
+        execution = self.create_mock_execution()
+        # A single gauge sample has no standard deviation
+        execution.metrics.append(PipelineMetric(name="queue.depth", value=3, type=MetricType.GAUGE))
+        executions = [execution]
+
+        with patch.object(metrics_collector, "ORJSON_AVAILABLE", use_orjson):
+            filepath = self.collector.save_aggregated_metrics(executions, "compact.json", compact=True)
+        content = filepath.read_text()
+        expected = self.collector.save_aggregated_metrics(executions, "pretty.json").read_text()
+
+        assert "\n" not in content
+        data = json.loads(content)
+        assert data["summary"]["executions"] == 1
+        assert data["metrics"]["queue.depth"]["std"] is None
+        assert data["metrics"]["scrape.success"]["total"] == 8.0
+        # Same values as the indented json module output, apart from the write time
+        data.pop("generated_at")
+        expected_data = json.loads(expected)
+        expected_data.pop("generated_at")
+        assert data == expected_data
+
 
 class TestErrorAnalyzer:
     """Test the ErrorAnalyzer class"""
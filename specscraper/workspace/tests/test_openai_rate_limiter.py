@@ -0,0 +1,102 @@
+"""Tests for the OpenAI rate limiter"""
+import pytest
+from pathlib import Path
+from unittest.mock import patch
+import sys
+
+# Add project root to path
+sys.path.append(str(Path(__file__).resolve().parent.parent.parent))
+
+from lib.utils import openai_rate_limiter
+from lib.utils.openai_rate_limiter import OpenAIRateLimiter
+
+MODEL = "test-model"
+
+
+class FakeClock:
+    """Monotonic clock that only moves when slept on or advanced"""
+
+    def __init__(self):
+        self.now = 1000.0
+        self.sleeps = []
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+class TestOpenAIRateLimiter:
+    """Test request and token windows on a fake clock"""
+
+    def setup_method(self):
+        """Create a limiter with small limits for the test model"""
+        self.clock = FakeClock()
+        self.patcher = patch.object(openai_rate_limiter, "time", self.clock)
+        self.patcher.start()
+        self.limiter = OpenAIRateLimiter()
+        self.limiter.set_custom_limits(MODEL, requests_per_minute=3, tokens_per_minute=100)
+
+    def teardown_method(self):
+        self.patcher.stop()
+        OpenAIRateLimiter.RATE_LIMITS.pop(MODEL, None)
+
+    def acquire_at(self, offset, tokens=1):
+        """Acquire at offset seconds after the clock's start"""
+        self.clock.now = 1000.0 + offset
+        self.limiter.acquire(MODEL, tokens)
+
+    def test_entries_expire_after_sixty_seconds(self):
+        """Test requests and tokens leave the window exactly 60 seconds later"""
+        self.acquire_at(0, 40)
+        self.acquire_at(10, 30)
+
+        self.clock.now = 1059.9
+        stats = self.limiter.get_usage_stats(MODEL)
+        assert (stats["current_requests"], stats["current_tokens"]) == (2, 70)
+
+        self.clock.now = 1060.0
+        stats = self.limiter.get_usage_stats(MODEL)
+        assert (stats["current_requests"], stats["current_tokens"]) == (1, 30)
+
+        self.clock.now = 1070.0
+        stats = self.limiter.get_usage_stats(MODEL)
+        assert (stats["current_requests"], stats["current_tokens"]) == (0, 0)
+        assert self.clock.sleeps == []
+
+    def test_waits_for_oldest_request_when_rpm_reached(self):
+        """Test a request over the RPM limit waits until the oldest one leaves the window"""
+        self.acquire_at(0)
+        self.acquire_at(10)
+        self.acquire_at(20)
+        self.acquire_at(25)
+
+        assert self.clock.sleeps == [pytest.approx(35.0)]
+        stats = self.limiter.get_usage_stats(MODEL)
+        assert stats["current_requests"] == 3
+
+    def test_waits_until_enough_tokens_expire(self):
+        """Test a request over the TPM limit waits for just enough old tokens to expire"""
+        self.acquire_at(0, 20)
+        self.acquire_at(5, 50)
+        self.acquire_at(20, 20)
+        # 90 tokens in the window; 50 more needs 40 to expire, which takes both
+        # of the first two entries, so the wait runs until the second expires
+        self.acquire_at(30, 50)
+
+        assert self.clock.sleeps == [pytest.approx(35.0)]
+        assert self.limiter.get_usage_stats(MODEL)["current_tokens"] == 70
+
+    def test_actual_tokens_replace_the_estimate(self):
+        """Test correcting the last estimate keeps the running total equal to the window"""
+        self.acquire_at(0, 40)
+        self.limiter.update_actual_tokens(MODEL, actual_tokens=10, estimated_tokens=40)
+        self.acquire_at(1, 85)
+
+        assert self.clock.sleeps == []
+        assert self.limiter.get_usage_stats(MODEL)["current_tokens"] == 95
+
+        self.clock.now = 1060.0
+        assert self.limiter.get_usage_stats(MODEL)["current_tokens"] == 85
@@ -0,0 +1,118 @@
+"""Tests for scraping functionality"""
+import bisect
+import random
+import pytest
+from pathlib import Path
+from unittest.mock import patch
+import sys
+
+# Add project root to path
+sys.path.append(str(Path(__file__).resolve().parent.parent.parent))
+
+from lib.core import scraping
+from lib.core.scraping import StealthScraper, CAPTCHA_INDICATORS, FIRECRAWL_RATE_LIMIT
+
+
+class FakeClock:
+    """Monotonic clock that only moves when slept on or advanced"""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+def max_in_window(times, window=60.0):
+    """Most timestamps falling in any half-open window of the given length"""
+    times = sorted(times)
+    return max(bisect.bisect_left(times, t + window) - i for i, t in enumerate(times))
+
+
+class TestFirecrawlRateLimit:
+    """Test the Firecrawl token bucket"""
+
+    def setup_method(self):
+        """Create a scraper whose rate limiter runs on a fake clock"""
+        self.clock = FakeClock()
+        self.patcher = patch.object(scraping, "time", self.clock)
+        self.patcher.start()
+        self.scraper = StealthScraper()
+
+    def teardown_method(self):
+        self.patcher.stop()
+
+    def acquire(self, count):
+        """Acquire count tokens back to back, returning when each was granted"""
+        granted = []
+        for _ in range(count):
+            self.scraper._acquire_rate_limit()
+            granted.append(self.clock.now)
+        return granted
+
+    def test_first_request_does_not_wait(self):
+        """Test a fresh scraper sends its first request immediately"""
+        assert self.acquire(1) == [1000.0]
+
+    def test_no_window_exceeds_limit(self):
+        """Test back-to-back requests stay within the limit in every 60 second window"""
+        granted = self.acquire(5 * FIRECRAWL_RATE_LIMIT)
+
+        assert max_in_window(granted) == FIRECRAWL_RATE_LIMIT
+        assert granted[-1] - granted[0] == pytest.approx((len(granted) - 1) * 60 / FIRECRAWL_RATE_LIMIT)
+
+    def test_idle_spell_does_not_allow_a_burst(self):
+        """Test tokens do not accumulate past one while the scraper is idle"""
+        granted = self.acquire(3)
+        self.clock.now += 600
+        granted += self.acquire(2 * FIRECRAWL_RATE_LIMIT)
+
+        assert max_in_window(granted) <= FIRECRAWL_RATE_LIMIT
+        assert granted[4] - granted[3] == pytest.approx(60 / FIRECRAWL_RATE_LIMIT)
+
+
+def naive_find_captcha(content_lower):
+    """Reference CAPTCHA scan that checks every marker"""
+    found_indicators = []
+    captcha_types = []
+    for captcha_type, indicators in CAPTCHA_INDICATORS.items():
+        type_found = [indicator for indicator in indicators if indicator in content_lower]
+        if type_found:
+            captcha_types.append(captcha_type)
+            found_indicators.extend(type_found)
+    return {
+        'present': len(found_indicators) > 0,
+        'type': captcha_types[0] if captcha_types else None,
+        'all_types': captcha_types,
+        'indicators': found_indicators
+    }
+
+
+class TestPageIssueDetection:
+    """Test page issue detection"""
+
+    def setup_method(self):
+        """Setup for each test"""
+        self.scraper = StealthScraper()
+
+    def test_captcha_scan_matches_naive_scan(self):
+        """Test skipping guarded CAPTCHA markers never changes what is found"""
+        markers = [marker for indicators in CAPTCHA_INDICATORS.values() for marker in indicators]
+        rng = random.Random(0)
+        pages = ["", "<html><body>plain product page</body></html>"] + [
+            "<div>" + " filler ".join(rng.sample(markers, rng.randint(1, 6))).upper() + "</div>"
+            for _ in range(2000)
+        ]
+        for page in pages:
+            issues = self.scraper.detect_page_issues(page)
+            assert issues['captcha'] == naive_find_captcha(page.lower()), page
+
+    def test_guarded_marker_found_with_its_guard(self):
+        """Test a marker that contains its guard is reported alongside it"""
+        captcha = self.scraper.detect_page_issues('<div class="g-recaptcha"></div>')['captcha']
+
+        assert captcha['type'] == 'recaptcha'
+        assert captcha['indicators'][:2] == ['recaptcha', 'g-recaptcha']
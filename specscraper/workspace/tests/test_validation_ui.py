@@ -0,0 +1,65 @@
+"""Tests for the simple validation UI endpoints"""
+import pytest
+from pathlib import Path
+import sys
+
+# Add project root to path
+sys.path.append(str(Path(__file__).resolve().parent.parent.parent))
+
+pytest.importorskip("flask")
+import pandas as pd
+
+import simple_validation_ui
+
+
+class TestRejectRows:
+    """Test the bulk row rejection endpoint"""
+
+    def setup_method(self):
+        """Load a small product table and reset validation state"""
+        simple_validation_ui.product_specs_df = pd.DataFrame({
+            'type': ['lamp', 'sofa', 'grill', 'hood'],
+            'model_no': ['A-1', 'B-2', 'C-3', 'D-4'],
+        })
+        simple_validation_ui.validation_state = {
+            'failed_cells': {},
+            'failed_rows': set(),
+            'stats': {'total_rows': 4, 'failed_rows': 0, 'field_failures': {'type': 0, 'model_no': 0}}
+        }
+        self.client = simple_validation_ui.app.test_client()
+
+    def test_reject_and_pass_rows(self):
+        """Test a selection of rows is rejected and passed in one request each"""
+        response = self.client.post('/reject_rows', json={'row_idxs': [0, 2, 3]})
+
+        assert response.status_code == 200
+        assert response.get_json()['stats']['failed_rows'] == 3
+        assert simple_validation_ui.validation_state['failed_rows'] == {0, 2, 3}
+
+        response = self.client.post('/reject_rows', json={'row_idxs': [2, 3], 'rejected': False})
+
+        assert response.get_json()['stats']['failed_rows'] == 1
+        assert simple_validation_ui.validation_state['failed_rows'] == {0}
+
+    @pytest.mark.parametrize("payload", [
+        {'row_idxs': "12"},
+        {'row_idxs': 1},
+        {'row_idxs': []},
+        {'row_idxs': [1, 4]},
+        {'row_idxs': [-1]},
+        {'row_idxs': [True]},
+        {'row_idxs': ["1"]},
+        {},
+    ])
+    def test_invalid_row_idxs_rejected(self, payload):
+        """Test malformed or out-of-range row indices return 400 without changing state"""
+        response = self.client.post('/reject_rows', json=payload)
+
+        assert response.status_code == 400
+        assert simple_validation_ui.validation_state['failed_rows'] == set()
+
+    def test_missing_json_body(self):
+        """Test a request without a JSON body returns 400"""
+        response = self.client.post('/reject_rows', data="not json")
+
+        assert response.status_code == 400